@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the per-tick work of waybar-cpu-usage.py as the core count
+grows: parsing and diffing /proc/stat (CpuSampler), pushing the history
+(UsageHistory) and the per-core tooltip data (summary(), or the total's
+stats and the heatmap above COMPACT_CORES). Runs on synthetic /proc/stat
+files of 8 to 256 cores, through the NumPy path when NumPy is installed
+and through the stdlib array fallback.
+
+    python3 bench/bench_cpu_cores.py
+"""
+
+import importlib.util
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORES = [8, 16, 32, 64, 128, 256]
+TICKS = 300
+
+spec = importlib.util.spec_from_file_location("cpu", os.path.join(REPO, "waybar/.config/waybar/waybar-cpu-usage.py"))
+cpu = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cpu)
+numpy = cpu.np
+
+
+class StatFile:
+    """A /proc/stat stand-in whose counters advance by a random amount on every write()."""
+
+    def __init__(self, path, cores):
+        self.path = path
+        self.counters = [[random.randint(0, 10 ** 7) for _ in range(10)] for _ in range(cores + 1)]
+
+    def write(self):
+        for row in self.counters[1:]:
+            for column in (0, 2, 3):  # user, system, idle
+                row[column] += random.randint(0, 50)
+        self.counters[0] = [sum(column) for column in zip(*self.counters[1:])]
+        names = ["cpu "] + [f"cpu{n} " for n in range(len(self.counters) - 1)]
+        with open(self.path, "w") as f:
+            for name, row in zip(names, self.counters):
+                f.write(name + " ".join(map(str, row)) + "\n")
+            f.write("intr 1 2 3\nctxt 12345\nbtime 1700000000\nprocesses 4242\n")
+
+
+def tick(sampler, history):
+    usage = sampler.sample()
+    history.push(usage)
+    cores = sampler.names[1:]
+    if len(cores) > cpu.COMPACT_CORES:
+        history.stats(0)
+        history.sparkline(0)
+        cpu.format_heatmap(cores, usage[1:], {})
+    else:
+        history.summary()
+
+
+def measure(path, cores):
+    """Returns the median CPU time of one tick in ms; rewriting the file is not counted."""
+    stat = StatFile(path, cores)
+    stat.write()
+    sampler = cpu.CpuSampler()
+    history = cpu.UsageHistory()
+    spent = []
+    for _ in range(TICKS):
+        stat.write()
+        start = time.process_time()
+        tick(sampler, history)
+        spent.append(time.process_time() - start)
+    return statistics.median(spent) * 1000
+
+
+def main():
+    random.seed(1)
+    root = tempfile.mkdtemp(prefix="fakestat-")
+    cpu.CpuSampler.STAT_PATH = os.path.join(root, "stat")
+    paths = [("numpy", numpy)] if numpy is not None else []
+    paths.append(("stdlib", None))
+    print(f"{TICKS} ticks each, history of {cpu.HISTORY_SIZE} samples, heatmap above {cpu.COMPACT_CORES} cores")
+    for label, module in paths:
+        cpu.np = module
+        results = "  ".join(f"{cores}: {measure(cpu.CpuSampler.STAT_PATH, cores):5.2f}" for cores in CORES)
+        print(f"{label:<6} ms per tick by cores  {results}")
+    if numpy is None:
+        print("numpy is not installed; only the stdlib path was measured")
+    shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
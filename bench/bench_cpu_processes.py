@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ProcessScanner in waybar-cpu-usage.py, the top CPU consumers
+list. By default it runs on a synthetic /proc of 1500 processes, which
+measures the scanner's own cost; with --live it scans the real /proc,
+topped up with idle child processes to 1500, which adds the kernel's cost
+of generating the stat files. The budget is well under 1% of one core at
+one scan per TOP_PROCESSES_INTERVAL.
+
+    python3 bench/bench_cpu_processes.py [--live]
+"""
+
+import importlib.util
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSES = 1500
+ROUNDS = 20
+CHURN = 10  # processes started and ended between scans in the churn case
+
+spec = importlib.util.spec_from_file_location("cpu", os.path.join(REPO, "waybar/.config/waybar/waybar-cpu-usage.py"))
+cpu = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cpu)
+
+root = None
+ticks = {}
+
+
+def write_stat(pid):
+    utime, stime = ticks[pid]
+    with open(f"{root}/{pid}/stat", "w") as f:
+        f.write(f"{pid} (proc {pid}) S 1 {pid} {pid} 0 -1 4194560 1200 0 0 0 {utime} {stime} 0 0 20 0 1 0 "
+                f"5000 123456789 2000 18446744073709551615 1 1 0 0 0 0 0 4096 0 0 0 0 17 3 0 0 0 0 0\n")
+
+
+def add_process(pid):
+    os.makedirs(f"{root}/{pid}")
+    ticks[pid] = [random.randint(0, 10000), random.randint(0, 1000)]
+    write_stat(pid)
+
+
+def remove_process(pid):
+    del ticks[pid]
+    shutil.rmtree(f"{root}/{pid}")
+
+
+def advance(busy=50):
+    """Lets a few processes use some CPU, like between two real scans."""
+    for pid in random.sample(sorted(ticks), busy):
+        ticks[pid][0] += random.randint(1, 500)
+        write_stat(pid)
+
+
+def timed(scanner):
+    start = time.process_time()
+    scanner.scan()
+    return (time.process_time() - start) * 1000
+
+
+def report(label, samples):
+    ms = sum(samples) / len(samples)
+    share = ms / 1000 / cpu.TOP_PROCESSES_INTERVAL * 100
+    print(f"{label:<44} {ms:7.2f} ms CPU per scan  {share:6.3f}% of a core")
+
+
+def synthetic():
+    global root
+    root = tempfile.mkdtemp(prefix="fakeproc-")
+    random.seed(1)
+    for pid in range(1, PROCESSES + 1):
+        add_process(pid)
+    print(f"synthetic /proc, {len(ticks)} processes, one scan every {cpu.TOP_PROCESSES_INTERVAL}s")
+
+    cpu.ProcessScanner.PROC = root
+    scanner = cpu.ProcessScanner()
+    samples = []
+    for _ in range(ROUNDS):
+        advance()
+        samples.append(timed(scanner))
+    report("steady state", samples)
+
+    samples = []
+    next_pid = PROCESSES + 1
+    for _ in range(ROUNDS):
+        for pid in random.sample(sorted(ticks), CHURN):
+            remove_process(pid)
+        for _ in range(CHURN):
+            add_process(next_pid)
+            next_pid += 1
+        advance()
+        samples.append(timed(scanner))
+    report(f"{CHURN} processes started and ended per scan", samples)
+
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def live():
+    running = sum(1 for entry in os.listdir("/proc") if entry.isdigit())
+    children = [subprocess.Popen(["sleep", "3600"]) for _ in range(max(0, PROCESSES - running))]
+    try:
+        running = sum(1 for entry in os.listdir("/proc") if entry.isdigit())
+        print(f"live /proc, {running} processes ({len(children)} idle children added)")
+        scanner = cpu.ProcessScanner()
+        samples = []
+        for _ in range(ROUNDS):
+            time.sleep(0.05)
+            samples.append(timed(scanner))
+        report("steady state", samples)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+if __name__ == "__main__":
+    if "--live" in sys.argv:
+        live()
+    else:
+        synthetic()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark for TopTalkers in waybar-network.py on a synthetic /proc: 1500
+processes, a third of them holding sockets, plus sockets that no readable
+fd points at (like root daemons seen from a user session). On the fake
+tree the size of a tmpfs fd/ directory stands in for the kernel's fd count,
+both change when fds are added. Besides CPU time it counts the listdir and
+readlink calls each scan makes.
+
+    python3 bench/bench_top_talkers.py
+"""
+
+import importlib.util
+import os
+import random
+import shutil
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROCESSES = 1500
+UNRESOLVABLE = 30
+ROUNDS = 20
+
+spec = importlib.util.spec_from_file_location("network", os.path.join(REPO, "waybar/.config/waybar/waybar-network.py"))
+network = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(network)
+
+root = tempfile.mkdtemp(prefix="fakeproc-")
+os.makedirs(f"{root}/net")
+lines = []
+next_inode = 10000
+
+
+def socket_line(inode):
+    queued = f"{random.randint(0, 4096):08X}:{random.randint(0, 4096):08X}"
+    return f"   0: 0100007F:BC8F 0100007F:0050 01 {queued} 00:00000000 00000000  1000        0 {inode} 1 0 20 4 30 10 -1"
+
+
+def add_process(pid, sockets, files=15):
+    global next_inode
+    fd_dir = f"{root}/{pid}/fd"
+    os.makedirs(fd_dir)
+    with open(f"{root}/{pid}/comm", "w") as f:
+        f.write(f"proc{pid}\n")
+    for fd in range(files):
+        os.symlink("/dev/null", f"{fd_dir}/{fd}")
+    for fd in range(files, files + sockets):
+        next_inode += 1
+        os.symlink(f"socket:[{next_inode}]", f"{fd_dir}/{fd}")
+        lines.append(socket_line(next_inode))
+
+
+def add_unresolvable(count):
+    global next_inode
+    for _ in range(count):
+        next_inode += 1
+        lines.append(socket_line(next_inode))
+
+
+def write_net():
+    with open(f"{root}/net/tcp", "w") as f:
+        f.write("  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n")
+        f.write("\n".join(lines) + "\n")
+
+
+def counted(function):
+    """Runs function, returns (CPU ms, listdir calls, readlink calls)."""
+    calls = {"listdir": 0, "readlink": 0}
+    listdir, readlink = os.listdir, os.readlink
+
+    def counting_listdir(path):
+        calls["listdir"] += 1
+        return listdir(path)
+
+    def counting_readlink(path):
+        calls["readlink"] += 1
+        return readlink(path)
+
+    os.listdir, os.readlink = counting_listdir, counting_readlink
+    try:
+        start = time.process_time()
+        function()
+        return (time.process_time() - start) * 1000, calls["listdir"], calls["readlink"]
+    finally:
+        os.listdir, os.readlink = listdir, readlink
+
+
+def report(label, samples):
+    cpu = sum(s[0] for s in samples) / len(samples)
+    listdirs = sum(s[1] for s in samples) / len(samples)
+    readlinks = sum(s[2] for s in samples) / len(samples)
+    print(f"{label:<42} {cpu:7.2f} ms CPU  {listdirs:7.0f} listdir  {readlinks:8.0f} readlink")
+
+
+def main():
+    random.seed(1)
+    for pid in range(1, PROCESSES + 1):
+        add_process(pid, 2 if pid % 3 == 0 else 0)
+    add_unresolvable(UNRESOLVABLE)
+    write_net()
+
+    network.TopTalkers.PROC = root
+    # The byte counters come from the real sock_diag anyway; don't wait between the two reads
+    network.TOP_TALKERS_SAMPLE = 0
+    talkers = network.TopTalkers()
+    print(f"{PROCESSES} processes, {len(lines)} sockets ({UNRESOLVABLE} unresolvable)")
+    report("cold scan", [counted(talkers.refresh)])
+    report("steady state", [counted(talkers.refresh) for _ in range(ROUNDS)])
+
+    samples = []
+    for i in range(ROUNDS):
+        add_process(PROCESSES + 100 + i, 5)
+        write_net()
+        samples.append(counted(talkers.refresh))
+    report("one new process with 5 sockets per scan", samples)
+
+    samples = []
+    for _ in range(ROUNDS):
+        add_unresolvable(1)
+        write_net()
+        samples.append(counted(talkers.refresh))
+    report("one new unresolvable socket per scan", samples)
+    shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
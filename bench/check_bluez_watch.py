@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Runs waybar-bt-battery.py's BlueZ watcher against a stand-in bluetoothd on
+a private session bus, while a discovered but unconnected device floods
+RSSI updates at 100 Hz the way discovery does. Checks that the flood
+prints nothing, that a battery change and a new selection still reach the
+bar promptly, and that a disconnect (several signals) is printed once.
+Exits with status 1 if a check fails.
+
+    python3 bench/check_bluez_watch.py
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import private_bus  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEADPHONES = "/org/bluez/hci0/dev_AA_00_00_00_00_01"
+MOUSE = "/org/bluez/hci0/dev_AA_00_00_00_00_02"
+BEACON = "/org/bluez/hci0/dev_CC_00_00_00_00_09"
+LATENCY = 0.25  # seconds a signal may take to reach the bar (SIGNAL_BURST plus slack)
+
+spec = importlib.util.spec_from_file_location("battery", os.path.join(REPO, "waybar/.config/waybar/waybar-bt-battery.py"))
+battery = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(battery)
+
+
+def device(mac, alias, connected, percent=None):
+    interfaces = {"org.bluez.Device1": {"Address": ("s", mac), "Alias": ("s", alias), "Connected": ("b", connected)}}
+    if percent is not None:
+        interfaces["org.bluez.Battery1"] = {"Percentage": ("y", percent)}
+    return interfaces
+
+
+class Bluez(private_bus.Service):
+    def __init__(self):
+        super().__init__("org.bluez")
+        self.objects = {
+            HEADPHONES: device("AA:00:00:00:00:01", "Headphones", True, 70),
+            MOUSE: device("AA:00:00:00:00:02", "Mouse", True, 50),
+            BEACON: device("CC:00:00:00:00:09", "Beacon", False),
+        }
+        self.flooding = True
+        threading.Thread(target=self.flood, daemon=True).start()
+
+    def handle(self, member, msg):
+        if member == "GetManagedObjects":
+            return "a{oa{sa{sv}}}", (self.objects,)
+        return None
+
+    def changed(self, path, interface, props):
+        self.objects[path].setdefault(interface, {}).update(props)
+        self.emit(path, "org.freedesktop.DBus.Properties", "PropertiesChanged", "sa{sv}as", (interface, props, []))
+
+    def flood(self):
+        rssi = 0
+        while self.flooding:
+            self.emit(BEACON, "org.freedesktop.DBus.Properties", "PropertiesChanged", "sa{sv}as",
+                      ("org.bluez.Device1", {"RSSI": ("n", -60 - rssi % 10)}, []))
+            rssi += 1
+            time.sleep(0.01)
+
+
+class Bar:
+    """Collects what the watcher prints, with the time each line arrived."""
+
+    def __init__(self):
+        self.lines = []
+
+    def print(self, line, flush=False):
+        self.lines.append((time.monotonic(), json.loads(line)))
+
+    def wait(self, count, timeout):
+        """Returns the seconds until there are count lines, or None on timeout."""
+        start = time.monotonic()
+        while time.monotonic() - start < timeout:
+            if len(self.lines) >= count:
+                return self.lines[count - 1][0] - start
+            time.sleep(0.002)
+        return None
+
+
+def main():
+    daemon = private_bus.start_bus()
+    config = tempfile.mkdtemp(prefix="bt-battery-")
+    try:
+        stub = Bluez()
+        bar = Bar()
+        battery.BLUEZ_BUS = "SESSION"
+        battery.PERSISTENT_FILE = os.path.join(config, "lastdev")
+        battery.HISTORY_DIR = os.path.join(config, "history")
+        battery.print = bar.print
+        with open(battery.PERSISTENT_FILE, "w") as f:
+            f.write("AA:00:00:00:00:01\n")
+        results = []
+
+        def check(label, ok, detail):
+            results.append(ok)
+            print(f"{'ok  ' if ok else 'FAIL'} {label:<40} {detail}")
+
+        threading.Thread(target=battery.watch_bluez, daemon=True).start()
+        elapsed = bar.wait(1, 2)
+        check("initial state", elapsed is not None and "70%" in bar.lines[0][1]["text"], bar.lines[0][1]["text"] if bar.lines else "")
+
+        time.sleep(1)
+        check("1 s of RSSI flood", len(bar.lines) == 1, f"{len(bar.lines) - 1} lines printed")
+
+        stub.changed(HEADPHONES, "org.bluez.Battery1", {"Percentage": ("y", 65)})
+        elapsed = bar.wait(2, 2)
+        ok = elapsed is not None and elapsed < LATENCY and "65%" in bar.lines[-1][1]["text"]
+        check("battery change during the flood", ok, f"{elapsed if elapsed is not None else float('inf'):.3f}s")
+
+        # A disconnect: Connected goes false, then Battery1 is removed
+        count = len(bar.lines)
+        stub.changed(HEADPHONES, "org.bluez.Device1", {"Connected": ("b", False)})
+        del stub.objects[HEADPHONES]["org.bluez.Battery1"]
+        stub.emit(HEADPHONES, "org.freedesktop.DBus.ObjectManager", "InterfacesRemoved", "oas",
+                  (HEADPHONES, ["org.bluez.Battery1"]))
+        time.sleep(0.5)
+        new = [line for _, line in bar.lines[count:]]
+        ok = len(new) == 1 and new[0].get("class") == "disconnected"
+        check("disconnect printed once", ok, f"{len(new)} lines printed")
+
+        with open(battery.PERSISTENT_FILE, "w") as f:
+            f.write("AA:00:00:00:00:02\n")
+        count = len(bar.lines)
+        elapsed = bar.wait(count + 1, battery.SELECTION_CHECK_INTERVAL + 1)
+        ok = elapsed is not None and "50%" in bar.lines[-1][1]["text"]
+        check("new selection", ok, f"{elapsed if elapsed is not None else float('inf'):.3f}s "
+                                   f"(checked every {battery.SELECTION_CHECK_INTERVAL}s)")
+        stub.flooding = False
+    finally:
+        daemon.terminate()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Runs waybar-network.py's ConnectionState against a stand-in NetworkManager
+on a private session bus. Checks that the cached connection name and SSID
+follow a network switch and a disconnect, that a burst of relevant
+signals costs one re-read, that signals about other properties (signal
+strength) cost none, and that nmcli is never run. Exits with status 1 if
+a check fails.
+
+    python3 bench/check_connection_state.py
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import private_bus  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NM = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+ACTIVE = f"{NM_PATH}/ActiveConnection/1"
+DEVICE = f"{NM_PATH}/Devices/2"
+HOME_AP = f"{NM_PATH}/AccessPoint/5"
+CAFE_AP = f"{NM_PATH}/AccessPoint/6"
+TIMEOUT = 2  # seconds to wait for the cache to catch up
+
+spec = importlib.util.spec_from_file_location("network", os.path.join(REPO, "waybar/.config/waybar/waybar-network.py"))
+network = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(network)
+
+
+class NetworkManager(private_bus.Service):
+    def __init__(self):
+        super().__init__(NM)
+        self.properties.update({
+            (NM_PATH, NM, "ActiveConnections"): ("ao", [ACTIVE]),
+            (ACTIVE, f"{NM}.Connection.Active", "Id"): ("s", "Home"),
+            (ACTIVE, f"{NM}.Connection.Active", "Devices"): ("ao", [DEVICE]),
+            (DEVICE, f"{NM}.Device", "Interface"): ("s", "wlan0"),
+            (DEVICE, f"{NM}.Device", "DeviceType"): ("u", 2),
+            (DEVICE, f"{NM}.Device.Wireless", "ActiveAccessPoint"): ("o", HOME_AP),
+            (HOME_AP, f"{NM}.AccessPoint", "Ssid"): ("ay", b"HomeNet"),
+            (CAFE_AP, f"{NM}.AccessPoint", "Ssid"): ("ay", b"CafeWifi"),
+        })
+
+    def refreshes(self):
+        """How many times the ActiveConnections list was read, i.e. full re-reads."""
+        return sum(1 for member, body in self.calls if member == "Get" and body[1:] == ("ActiveConnections",))
+
+
+def wait_for(state, expected):
+    """Returns the seconds until state.get("wlan0") == expected, or None on timeout."""
+    start = time.monotonic()
+    while time.monotonic() - start < TIMEOUT:
+        if state.get("wlan0") == expected:
+            return time.monotonic() - start
+        time.sleep(0.005)
+    return None
+
+
+def main():
+    daemon = private_bus.start_bus()
+    try:
+        stub = NetworkManager()
+        network.NM_BUS = "SESSION"
+        nmcli = []
+        network.get_active_connections = lambda: nmcli.append("get_active_connections") or {}
+        results = []
+
+        def check(label, ok, detail):
+            results.append(ok)
+            print(f"{'ok  ' if ok else 'FAIL'} {label:<40} {detail}")
+
+        state = network.ConnectionState()
+        elapsed = wait_for(state, ("Home", "HomeNet"))
+        check("initial state", elapsed is not None, f"{elapsed or TIMEOUT:.3f}s")
+
+        # 50 AccessPoint Strength updates: nothing the bar shows
+        before = stub.refreshes()
+        for strength in range(50):
+            stub.emit_properties(HOME_AP, f"{NM}.AccessPoint", {"Strength": ("y", 40 + strength % 20)})
+        time.sleep(0.5)
+        check("signal strength noise", stub.refreshes() == before, f"{stub.refreshes() - before} re-reads")
+
+        # Roaming to another network: a burst of property changes
+        before = stub.refreshes()
+        stub.properties[(ACTIVE, f"{NM}.Connection.Active", "Id")] = ("s", "Cafe")
+        for _ in range(10):
+            stub.emit_properties(DEVICE, f"{NM}.Device.Wireless", {"ActiveAccessPoint": ("o", CAFE_AP)})
+        stub.emit_properties(ACTIVE, f"{NM}.Connection.Active", {"Id": ("s", "Cafe")})
+        elapsed = wait_for(state, ("Cafe", "CafeWifi"))
+        time.sleep(0.3)
+        check("network switch", elapsed is not None, f"{elapsed or TIMEOUT:.3f}s")
+        check("burst of 11 signals", stub.refreshes() - before == 1, f"{stub.refreshes() - before} re-reads")
+
+        # Disconnect: the ActiveConnection goes away
+        stub.emit(ACTIVE, f"{NM}.Connection.Active", "StateChanged", "uu", (4, 2))
+        stub.emit_properties(NM_PATH, NM, {"ActiveConnections": ("ao", []), "State": ("u", 20)})
+        elapsed = wait_for(state, (None, None))
+        check("disconnect", elapsed is not None, f"{elapsed or TIMEOUT:.3f}s")
+
+        check("no nmcli", not nmcli, f"{len(nmcli)} nmcli polls")
+    finally:
+        daemon.terminate()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
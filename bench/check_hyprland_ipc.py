@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Runs rofi/hyprland_ipc.py against a fake Hyprland (bench/fake_hyprland.py)
+that replays recorded JSON. Checks single queries, [[BATCH]] replies split
+on the delimiter and the fallback for releases that glue the replies
+together, dispatch() with an accepted and a refused dispatcher, and the
+event socket. Exits with status 1 if a check fails.
+
+    python3 bench/check_hyprland_ipc.py
+"""
+
+import importlib.util
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_hyprland  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location("hyprland_ipc", os.path.join(REPO, "rofi/hyprland_ipc.py"))
+hyprland_ipc = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(hyprland_ipc)
+
+results = []
+
+
+def check(label, ok, detail=""):
+    results.append(ok)
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<44} {detail}")
+
+
+def main():
+    hypr = fake_hyprland.FakeHyprland(batch_delimiter=True)
+    try:
+        check("request_json", hyprland_ipc.request_json("monitors") == fake_hyprland.MONITORS)
+
+        del hypr.requests[:]
+        monitors, clients = hyprland_ipc.batch_json(["monitors", "clients"])
+        ok = monitors == fake_hyprland.MONITORS and clients == fake_hyprland.CLIENTS
+        check("batch with delimiter", ok and len(hypr.requests) == 1, f"{len(hypr.requests)} round trip(s)")
+
+        hypr.batch_delimiter = False
+        del hypr.requests[:]
+        monitors, clients = hyprland_ipc.batch_json(["monitors", "clients"])
+        ok = monitors == fake_hyprland.MONITORS and clients == fake_hyprland.CLIENTS
+        check("batch without delimiter falls back", ok and len(hypr.requests) == 3,
+              f"{len(hypr.requests)} round trip(s): {', '.join(hypr.requests)}")
+
+        del hypr.requests[:]
+        ok = hyprland_ipc.dispatch("focuswindow", "address:0x5001")
+        check("dispatch accepted", ok and hypr.requests == ["dispatch focuswindow address:0x5001"], hypr.requests[-1])
+        check("dispatch refused", not hyprland_ipc.dispatch("nosuchdispatcher"), hypr.requests[-1])
+
+        with hyprland_ipc.open_event_socket() as events:
+            hypr.wait_for_subscriber()
+            hypr.send_events("workspace>>2", "activewindowv2>>5006")
+            events.settimeout(2)
+            received = b""
+            while received.count(b"\n") < 2:
+                received += events.recv(4096)
+        check("event socket", received == b"workspace>>2\nactivewindowv2>>5006\n", repr(received))
+    finally:
+        hypr.close()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
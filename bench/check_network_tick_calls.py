@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Counts the filesystem calls each tick of the waybar-network.py monitor
+makes on this machine. Interface metadata is cached by ifindex, so only the
+first tick should touch sysfs; every later tick should make no metadata
+calls (stat, lstat, exists, realpath, listdir, readlink, open) at all.
+Exits with status 1 if one does. The monitor runs in a thread with the
+D-Bus/nmcli and Wi-Fi scan threads disabled and the top talkers off, and
+each line it would print ends a tick.
+
+    python3 bench/check_network_tick_calls.py [--aggregate all|IF,IF...]
+"""
+
+import builtins
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICKS = 5
+TIMEOUT = 30  # seconds
+
+spec = importlib.util.spec_from_file_location("network", os.path.join(REPO, "waybar/.config/waybar/waybar-network.py"))
+network = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(network)
+
+network.TOP_TALKERS = 0
+network.ConnectionState.run = lambda self: None
+network.WifiScanCache.run = lambda self: None
+
+calls = {}
+ticks = []
+done = threading.Event()
+
+
+def counting(module, name):
+    function = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        if threading.current_thread().name == "monitor":
+            calls[name] = calls.get(name, 0) + 1
+        return function(*args, **kwargs)
+
+    setattr(module, name, wrapper)
+
+
+def end_tick(*args, **kwargs):
+    if threading.current_thread().name != "monitor":
+        return builtins.print(*args, **kwargs)
+    ticks.append(dict(calls))
+    calls.clear()
+    if len(ticks) >= TICKS:
+        done.set()
+
+
+def main():
+    for name in ("stat", "lstat", "listdir", "scandir", "readlink", "open"):
+        counting(os, name)
+    for name in ("exists", "isdir", "realpath"):
+        counting(os.path, name)
+    counting(builtins, "open")
+    network.print = end_tick
+
+    sys.argv = [network.__file__] + sys.argv[1:]
+    threading.Thread(target=network.main, name="monitor", daemon=True).start()
+    if not done.wait(TIMEOUT):
+        print(f"only {len(ticks)} ticks in {TIMEOUT}s")
+        sys.exit(1)
+
+    failed = False
+    for number, counts in enumerate(ticks):
+        total = sum(counts.values())
+        detail = ", ".join(f"{name} {count}" for name, count in sorted(counts.items()))
+        print(f"tick {number}: {total:3d} calls  {detail}")
+        failed = failed or (number > 0 and total > 0)
+    print("FAIL: a steady-state tick touched the filesystem" if failed else "ok: steady-state ticks make no filesystem calls")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
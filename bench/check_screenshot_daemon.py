@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Runs rofi-window-screenshot.py --daemon against a fake Hyprland
+(bench/fake_hyprland.py) and a fake grim that logs its calls and prints a
+blank PPM. Replays event sequences for a focus change, a workspace switch
+(with a burst of follow-up events) and closing windows, and checks what
+gets captured or deleted, that the daemon survives, that it cleans up when
+Hyprland goes away, and that a stale pid file left by a dead daemon is not
+taken for a running one. The thumbnail cache goes to a temporary
+directory. Exits with status 1 if a check fails.
+
+    python3 bench/check_screenshot_daemon.py
+"""
+
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_hyprland  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(REPO, "rofi/rofi-window-screenshot.py")
+
+FAKE_GRIM = """#!/usr/bin/env python3
+import os, sys
+args = sys.argv[1:]
+with open(os.environ["FAKE_GRIM_LOG"], "a") as f:
+    f.write(" ".join(args) + "\\n")
+scale = float(args[args.index("-s") + 1]) if "-s" in args else 1.0
+width, height = round(1920 * scale), round(1080 * scale)
+image = b"P6\\n%d %d\\n255\\n" % (width, height) + bytes(width * height * 3)
+if args[-1] == "-":
+    sys.stdout.buffer.write(image)
+else:
+    open(args[-1], "wb").write(image)
+"""
+
+# Loads the script with the cache redirected, keeping "--daemon" in the real command line
+DAEMON = """import importlib.util, os, sys
+script, cache = sys.argv[1], sys.argv[3]
+sys.path.insert(0, os.path.dirname(script))
+spec = importlib.util.spec_from_file_location("screenshot", script)
+module = importlib.util.module_from_spec(spec)
+module.__file__ = script
+spec.loader.exec_module(module)
+module.CACHE_DIR = cache
+module.DAEMON_PID_FILE = os.path.join(cache, "daemon.pid")
+sys.argv = [script, "--daemon"]
+module.main()
+"""
+
+sys.path.insert(0, os.path.join(REPO, "rofi"))
+spec = importlib.util.spec_from_file_location("screenshot", SCRIPT)
+screenshot = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(screenshot)
+
+results = []
+
+
+def check(label, ok, detail=""):
+    results.append(ok)
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<44} {detail}")
+
+
+def grim_calls(log):
+    try:
+        with open(log) as f:
+            return f.read().splitlines()
+    except OSError:
+        return []
+
+
+def settle(log, timeout=3):
+    """Waits until grim has not been called for a while; returns the calls so far."""
+    deadline = time.monotonic() + timeout
+    count = -1
+    while time.monotonic() < deadline:
+        time.sleep(screenshot.DAEMON_SETTLE + 0.3)
+        calls = grim_calls(log)
+        if len(calls) == count:
+            break
+        count = len(calls)
+    return grim_calls(log)
+
+
+def thumbnail(address):
+    client = next(c for c in fake_hyprland.CLIENTS if c["address"] == address)
+    return os.path.exists(screenshot.thumbnail_path(client))
+
+
+def main():
+    work = tempfile.mkdtemp(prefix="screenshot-daemon-")
+    cache = os.path.join(work, "cache")
+    log = os.path.join(work, "grim.log")
+    screenshot.CACHE_DIR = cache
+    screenshot.DAEMON_PID_FILE = os.path.join(cache, "daemon.pid")
+    with open(os.path.join(work, "grim"), "w") as f:
+        f.write(FAKE_GRIM)
+    os.chmod(os.path.join(work, "grim"), 0o755)
+
+    hypr = fake_hyprland.FakeHyprland()
+    env = dict(os.environ, PATH=f"{work}:{os.environ['PATH']}", FAKE_GRIM_LOG=log)
+    daemon = subprocess.Popen([sys.executable, "-c", DAEMON, SCRIPT, "--daemon", cache], env=env)
+    try:
+        hypr.wait_for_subscriber()
+        calls = settle(log)
+        visible = all(thumbnail(a) for a in ("0x5000", "0x5001", "0x5003")) and not thumbnail("0x5006")
+        check("startup captures workspace 1", len(calls) == 1 and visible, f"{len(calls)} grim run(s)")
+        check("daemon_running() while it runs", screenshot.daemon_running())
+
+        # Focus moves from kitty to firefox: kitty is captured again once things settle
+        before = len(calls)
+        hypr.send_events("activewindow>>kitty,~/src", "activewindowv2>>5000")
+        hypr.send_events("activewindow>>firefox,Hyprland Wiki", "activewindowv2>>5001")
+        calls = settle(log)
+        check("focus change recaptures the old window", len(calls) - before == 1, f"{len(calls) - before} grim run(s)")
+
+        # Switch to workspace 2, followed by a burst of window events
+        before = len(calls)
+        hypr.monitors[0]["activeWorkspace"] = {"id": 2, "name": "2"}
+        hypr.send_events("workspace>>2", "workspacev2>>2,2", "activewindowv2>>5006",
+                         *["movewindow>>5006,2"] * 30)
+        calls = settle(log)
+        check("workspace switch, burst captured once", len(calls) - before == 1 and thumbnail("0x5006"),
+              f"{len(calls) - before} grim run(s)")
+
+        # Close the window: its thumbnail goes at once, without a capture
+        before = len(calls)
+        hypr.clients = [c for c in hypr.clients if c["address"] != "0x5006"]
+        hypr.send_events("closewindow>>5006")
+        time.sleep(0.2)
+        check("closewindow deletes the thumbnail", not thumbnail("0x5006") and len(grim_calls(log)) == before)
+        hypr.send_events("closewindow>>5006", "closewindow>>5003")
+        time.sleep(0.3)
+        check("closing again is harmless", daemon.poll() is None and not thumbnail("0x5003"))
+
+        # Hyprland exits: the daemon stops and removes its pid file
+        for conn in hypr.subscribers:
+            conn.close()
+        code = daemon.wait(timeout=5)
+        check("exits with Hyprland", code == 0 and not os.path.exists(screenshot.DAEMON_PID_FILE), f"status {code}")
+
+        # A daemon killed without cleaning up, its pid since reused by another process
+        other = subprocess.Popen(["sleep", "30"])
+        with open(screenshot.DAEMON_PID_FILE, "w") as f:
+            f.write(str(other.pid))
+        check("reused pid is not the daemon", not screenshot.daemon_running(), f"pid {other.pid} is sleep")
+        other.kill()
+        other.wait()
+    finally:
+        if daemon.poll() is None:
+            daemon.kill()
+        hypr.close()
+        shutil.rmtree(work, ignore_errors=True)
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Runs the D-Bus path of waybar-network.py's Wi-Fi connect against a stand-in
+NetworkManager on a private session bus, and checks when it asks for a
+password. The stub reports failures the way NetworkManager does for Wi-Fi:
+the ActiveConnection goes DEACTIVATED with DEVICE_DISCONNECTED, and only
+the device's FAILED transition (or its StateReason) says why. Exits with
+status 1 if any scenario goes differently.
+
+    python3 bench/check_wifi_connect.py
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import private_bus  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NM = "org.freedesktop.NetworkManager"
+DEVICE = "/org/freedesktop/NetworkManager/Devices/2"
+PROFILE = "/org/freedesktop/NetworkManager/Settings/1"
+ACTIVE = "/org/freedesktop/NetworkManager/ActiveConnection/"
+REASON_DEVICE_DISCONNECTED = 3
+
+spec = importlib.util.spec_from_file_location("network", os.path.join(REPO, "waybar/.config/waybar/waybar-network.py"))
+network = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(network)
+
+# name: (profile has a PSK, device reasons of the failed attempts, send FAILED signals,
+#        expected result, expected password prompts)
+SCENARIOS = {
+    "switch from another network": (True, [], True, True, 0),
+    "wrong PSK (supplicant disconnect)": (True, [8], True, True, 1),
+    "changed PSK (no secrets)": (True, [7], True, True, 1),
+    "wrong PSK, only StateReason says so": (True, [8], False, True, 1),
+    "network out of range": (True, [53, 53], True, False, 0),
+    "open network fails": (False, [8], True, False, 0),
+    "new PSK refused too": (True, [8, 8], True, False, 1),
+}
+
+
+class NetworkManager(private_bus.Service):
+    def __init__(self):
+        super().__init__(NM)
+        self.activations = 0
+        self.scenario = None
+        self.properties[(DEVICE, f"{NM}.Device", "StateReason")] = ("(uu)", (30, 0))
+
+    def reset(self, scenario):
+        self.scenario = scenario
+        self.activations = 0
+
+    def handle(self, member, msg):
+        secured, reasons, failed_signals, _, _ = self.scenario
+        if member == "GetDeviceByIpIface":
+            return "o", (DEVICE,)
+        if member == "ListConnections":
+            return "ao", ([PROFILE],)
+        if member == "GetSettings":
+            settings = {"connection": {"id": ("s", "Home")}, "802-11-wireless": {"ssid": ("ay", b"Home")}}
+            if secured:
+                settings["802-11-wireless-security"] = {"key-mgmt": ("s", "wpa-psk")}
+            return "a{sa{sv}}", (settings,)
+        if member == "Update":
+            return "", ()
+        if member == "ActivateConnection":
+            self.activations += 1
+            path = f"{ACTIVE}{self.activations + 1}"
+            reason = reasons[self.activations - 1] if self.activations <= len(reasons) else None
+            threading.Thread(target=self.activation, args=(path, reason, failed_signals)).start()
+            return "o", (path,)
+        return None
+
+    def device_state(self, new, old, reason):
+        self.properties[(DEVICE, f"{NM}.Device", "StateReason")] = ("(uu)", (new, reason))
+        self.emit(DEVICE, f"{NM}.Device", "StateChanged", "uuu", (new, old, reason))
+
+    def activation(self, path, reason, failed_signals):
+        time.sleep(0.02)
+        # The previous connection goes down first, device and ActiveConnection both
+        self.device_state(110, 100, 39)
+        self.emit(f"{ACTIVE}1", f"{NM}.Connection.Active", "StateChanged", "uu", (3, 2))
+        self.device_state(30, 110, 39)
+        self.emit(f"{ACTIVE}1", f"{NM}.Connection.Active", "StateChanged", "uu", (4, 2))
+        for state in (40, 50, 60, 70):
+            self.device_state(state, state - 10, 0)
+        if reason is None:
+            self.device_state(100, 90, 0)
+            self.emit(path, f"{NM}.Connection.Active", "StateChanged", "uu", (2, 0))
+            return
+        if failed_signals:
+            self.device_state(120, 60, reason)
+        else:
+            self.properties[(DEVICE, f"{NM}.Device", "StateReason")] = ("(uu)", (120, reason))
+        self.emit(path, f"{NM}.Connection.Active", "StateChanged", "uu", (4, REASON_DEVICE_DISCONNECTED))
+        if failed_signals:
+            # NetworkManager moves on to DISCONNECTED right after FAILED
+            self.device_state(30, 120, 0)
+
+
+def main():
+    daemon = private_bus.start_bus()
+    try:
+        stub = NetworkManager()
+        network.NM_BUS = "SESSION"
+        network.notify_monitors = lambda text: None
+        failed = False
+        for name, scenario in SCENARIOS.items():
+            prompts = []
+            network.prompt_for_password = lambda ssid: prompts.append(ssid) or "secret"
+            stub.reset(scenario)
+            start = time.monotonic()
+            result = network.connect_to_wifi("wlan0", "Home")
+            elapsed = time.monotonic() - start
+            ok = (result, len(prompts)) == scenario[3:]
+            failed = failed or not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<38} connected={result!s:<5} prompts={len(prompts)}  {elapsed:5.2f}s")
+    finally:
+        daemon.terminate()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
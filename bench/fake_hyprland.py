@@ -0,0 +1,122 @@
+"""
+Shared by the checks for rofi/: a Hyprland stand-in on Unix sockets in a
+temporary runtime directory. .socket.sock answers requests from recorded
+JSON (batches with or without the delimiter newer releases put between
+replies) and logs them; .socket2.sock lets a check push events. MONITORS
+and CLIENTS are a recorded single-monitor session.
+"""
+
+import copy
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+SIGNATURE = "fake"
+BATCH_DELIMITER = "\n\n\n"
+
+MONITORS = [
+    {"id": 0, "name": "DP-1", "description": "Dell Inc. DELL U2719D", "width": 1920, "height": 1080,
+     "refreshRate": 60.0, "x": 0, "y": 0, "activeWorkspace": {"id": 1, "name": "1"},
+     "specialWorkspace": {"id": 0, "name": ""}, "reserved": [0, 30, 0, 0], "scale": 1.0,
+     "transform": 0, "focused": True, "dpmsStatus": True, "vrr": False, "disabled": False},
+]
+
+
+def client(address, title, wm_class, workspace, at, size, floating=False):
+    return {"address": address, "mapped": True, "hidden": False, "at": at, "size": size,
+            "workspace": {"id": workspace, "name": str(workspace)}, "floating": floating, "monitor": 0,
+            "class": wm_class, "title": title, "initialClass": wm_class, "initialTitle": title,
+            "pid": int(address, 16) % 30000 + 1000, "xwayland": False, "pinned": False, "fullscreen": 0,
+            "grouped": [], "swallowing": "0x0", "focusHistoryID": 0}
+
+
+CLIENTS = [
+    client("0x5000", "~/src", "kitty", 1, [0, 30], [960, 1050]),
+    client("0x5001", "Hyprland Wiki - Mozilla Firefox", "firefox", 1, [960, 30], [960, 1050]),
+    client("0x5003", "big_buck_bunny.mkv - mpv", "mpv", 1, [600, 300], [640, 360], floating=True),
+    client("0x5006", "rofi-window-screenshot.py - Code", "code", 2, [0, 30], [1920, 1050]),
+]
+
+
+class FakeHyprland:
+    def __init__(self, batch_delimiter=True):
+        self.runtime = tempfile.mkdtemp(prefix="fakehypr-")
+        os.environ["XDG_RUNTIME_DIR"] = self.runtime
+        os.environ["HYPRLAND_INSTANCE_SIGNATURE"] = SIGNATURE
+        directory = os.path.join(self.runtime, "hypr", SIGNATURE)
+        os.makedirs(directory)
+        self.batch_delimiter = batch_delimiter
+        self.monitors = copy.deepcopy(MONITORS)
+        self.clients = copy.deepcopy(CLIENTS)
+        self.requests = []
+        self.subscribers = []
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(os.path.join(directory, ".socket.sock"))
+        self.server.listen(16)
+        self.events = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.events.bind(os.path.join(directory, ".socket2.sock"))
+        self.events.listen(4)
+        threading.Thread(target=self.serve, daemon=True).start()
+        threading.Thread(target=self.accept_subscribers, daemon=True).start()
+
+    def reply(self, command):
+        if command.startswith("dispatch "):
+            dispatcher = command.split()[1]
+            return "ok" if dispatcher in ("focuswindow", "workspace") else f"Invalid dispatcher {dispatcher}"
+        if command == "j/monitors":
+            return json.dumps(self.monitors, indent=4)
+        if command == "j/clients":
+            return json.dumps(self.clients, indent=4)
+        return "unknown request"
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn:
+                command = conn.recv(65536).decode()
+                self.requests.append(command)
+                if command.startswith("[[BATCH]]"):
+                    replies = [self.reply(part) for part in command[len("[[BATCH]]"):].split(";")]
+                    if self.batch_delimiter:
+                        reply = "".join(part + BATCH_DELIMITER for part in replies)
+                    else:
+                        # Releases before the delimiter glue the replies together
+                        reply = "".join(replies)
+                else:
+                    reply = self.reply(command)
+                conn.sendall(reply.encode())
+
+    def accept_subscribers(self):
+        while True:
+            try:
+                conn, _ = self.events.accept()
+            except OSError:
+                return
+            self.subscribers.append(conn)
+
+    def wait_for_subscriber(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not self.subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return bool(self.subscribers)
+
+    def send_events(self, *events):
+        """Sends "EVENT>>DATA" lines to every event socket client."""
+        data = "".join(event + "\n" for event in events).encode()
+        for conn in self.subscribers:
+            conn.sendall(data)
+
+    def close(self):
+        for conn in self.subscribers:
+            conn.close()
+        self.server.close()
+        self.events.close()
+        shutil.rmtree(self.runtime, ignore_errors=True)
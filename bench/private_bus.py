@@ -0,0 +1,81 @@
+"""
+Shared by the checks that run a script against stand-in D-Bus services
+(NetworkManager, BlueZ): a private session bus, and a service that owns a
+name on it, answers method calls from a handler and emits signals. Needs
+dbus-daemon and jeepney.
+"""
+
+import os
+import subprocess
+import threading
+
+from jeepney import DBusAddress, HeaderFields, MessageType, new_error, new_method_return, new_signal
+from jeepney.bus_messages import message_bus
+from jeepney.io.blocking import open_dbus_connection
+
+
+def start_bus():
+    """Starts a private dbus-daemon and points DBUS_SESSION_BUS_ADDRESS at it; returns the process."""
+    daemon = subprocess.Popen(["dbus-daemon", "--session", "--nofork", "--print-address=1"],
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    os.environ["DBUS_SESSION_BUS_ADDRESS"] = daemon.stdout.readline().strip()
+    return daemon
+
+
+class Service:
+    """
+    Owns a bus name and serves it from a thread. Properties.Get and GetAll
+    are answered from self.properties, {(path, interface, name): (signature, value)};
+    every other call goes to handle(member, msg), which returns
+    (signature, body) or None for an UnknownMethod error. self.calls
+    records (member, body) of every call.
+    """
+
+    def __init__(self, name):
+        self.properties = {}
+        self.calls = []
+        self.lock = threading.Lock()
+        self.conn = open_dbus_connection(bus="SESSION")
+        self.conn.send_and_get_reply(message_bus.RequestName(name))
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def send(self, msg):
+        with self.lock:
+            self.conn.send(msg)
+
+    def emit(self, path, interface, member, signature, body):
+        self.send(new_signal(DBusAddress(path, interface=interface), member, signature, body))
+
+    def emit_properties(self, path, interface, changed):
+        """Updates self.properties and sends PropertiesChanged; changed is {name: (signature, value)}."""
+        for name, value in changed.items():
+            self.properties[(path, interface, name)] = value
+        self.emit(path, "org.freedesktop.DBus.Properties", "PropertiesChanged", "sa{sv}as", (interface, changed, []))
+
+    def handle(self, member, msg):
+        return None
+
+    def serve(self):
+        while True:
+            try:
+                msg = self.conn.receive()
+            except OSError:
+                return
+            if msg.header.message_type != MessageType.method_call:
+                continue
+            path = msg.header.fields.get(HeaderFields.path)
+            member = msg.header.fields.get(HeaderFields.member)
+            self.calls.append((member, msg.body))
+            if member == "Get":
+                value = self.properties.get((path, *msg.body))
+                reply = ("v", (value,)) if value is not None else None
+            elif member == "GetAll":
+                props = {name: value for (p, interface, name), value in self.properties.items()
+                         if p == path and interface == msg.body[0]}
+                reply = ("a{sv}", (props,))
+            else:
+                reply = self.handle(member, msg)
+            if reply is None:
+                self.send(new_error(msg, "org.freedesktop.DBus.Error.UnknownMethod"))
+            else:
+                self.send(new_method_return(msg, *reply))
@@ -0,0 +1,82 @@
+"""
+Minimal Hyprland IPC client, talking to the compositor's sockets directly
+instead of forking hyprctl. Only the standard library is used, so importing
+it costs next to nothing:
+
+    import hyprland_ipc
+    monitors, clients = hyprland_ipc.batch_json(["monitors", "clients"])
+    hyprland_ipc.dispatch("focuswindow", "address:0x55d0c0ffee00")
+"""
+
+import json
+import os
+import socket
+
+# Hyprland answers "[[BATCH]]" requests with one reply per command, each followed by this
+BATCH_DELIMITER = "\n\n\n"
+
+
+def socket_path(name=".socket.sock"):
+    """Path of one of the running instance's sockets (".socket.sock" or ".socket2.sock")."""
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        raise OSError("HYPRLAND_INSTANCE_SIGNATURE is not set; is Hyprland running?")
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    path = os.path.join(runtime_dir, "hypr", signature, name)
+    if not os.path.exists(path):
+        # Hyprland before 0.40 kept its sockets in /tmp
+        path = os.path.join("/tmp/hypr", signature, name)
+    return path
+
+
+def request(command):
+    """Sends one request (e.g. "j/clients") and returns the reply as text."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path())
+        sock.sendall(command.encode())
+        # Hyprland closes the connection once the whole reply is written
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks).decode(errors="replace")
+
+
+def batch(commands):
+    """Runs several requests in one round trip, returns their replies in order."""
+    reply = request("[[BATCH]]" + ";".join(commands))
+    replies = reply.split(BATCH_DELIMITER)
+    if replies and replies[-1] == "":
+        replies.pop()
+    if len(replies) != len(commands):
+        # Older releases glue the replies together without a delimiter
+        return [request(command) for command in commands]
+    return replies
+
+
+def request_json(command):
+    """Runs a query such as "clients" with JSON output and returns the decoded result."""
+    return json.loads(request(f"j/{command}"))
+
+
+def batch_json(commands):
+    """Like request_json() for several queries, in one round trip."""
+    return [json.loads(reply) for reply in batch([f"j/{command}" for command in commands])]
+
+
+def dispatch(dispatcher, argument=""):
+    """Runs a dispatcher (e.g. "focuswindow", "address:0x..."); returns True if Hyprland says ok."""
+    return request(f"dispatch {dispatcher} {argument}".rstrip()).strip() == "ok"
+
+
+def open_event_socket():
+    """Returns a socket connected to the event stream (.socket2.sock), one "EVENT>>DATA" per line."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path(".socket2.sock"))
+    except OSError:
+        sock.close()
+        raise
+    return sock
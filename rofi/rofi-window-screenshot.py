@@ -1,31 +1,76 @@
 #!/usr/bin/env python3
 
-import json
 import subprocess
 import os
 import sys
 import shutil
+import time
+import glob
+import select
+import struct
+import zlib
 from concurrent.futures import ThreadPoolExecutor
 
+import hyprland_ipc
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # Configuration
 CACHE_DIR = "/tmp/rofi-window-thumbs"
+THUMB_SIZE = 256  # longest side of a thumbnail, in logical pixels
+THUMB_REFRESH = 10  # seconds before a visible window's thumbnail is taken again
+CACHE_MAX_BYTES = 16 * 1024 * 1024  # least recently used thumbnails are deleted beyond this
+# "monitor": one grim per monitor, windows cropped in process; "window": one grim per window
+CAPTURE_MODE = "monitor"
+DAEMON_PID_FILE = os.path.join(CACHE_DIR, "daemon.pid")
+DAEMON_SETTLE = 0.2  # seconds of quiet on the event socket before the daemon captures
+
+# Events after which the set of visible windows (or their geometry) may have changed
+REFRESH_EVENTS = {"workspace", "focusedmon", "movewindow", "openwindow", "changefloatingmode",
+                  "fullscreen", "activespecial"}
+
+def query_hyprland():
+    # Both queries in one round trip on Hyprland's socket
+    monitors, clients = hyprland_ipc.batch_json(["monitors", "clients"])
+    return monitors, clients
 
 def get_hyprland_data():
     try:
-        monitors = json.loads(subprocess.check_output(["hyprctl", "monitors", "-j"]))
-        clients = json.loads(subprocess.check_output(["hyprctl", "clients", "-j"]))
-        return monitors, clients
+        return query_hyprland()
     except Exception as e:
         sys.stderr.write(f"Error getting Hyprland data: {e}\n")
         sys.exit(1)
 
-def take_screenshot(client, active_workspace_ids):
-    address = client["address"]
-    workspace_id = client["workspace"]["id"]
-    
-    # Only screenshot if on an active workspace
-    if workspace_id not in active_workspace_ids:
-        return client, None
+def thumbnail_path(client):
+    # Keyed by address and geometry: a moved or resized window gets a new thumbnail
+    at = client["at"]
+    size = client["size"]
+    return os.path.join(CACHE_DIR, f"{client['address']}-{at[0]}_{at[1]}_{size[0]}x{size[1]}.png")
+
+def cached_age(filename):
+    try:
+        return time.time() - os.path.getmtime(filename)
+    except OSError:
+        return None
+
+def needs_capture(client, active_workspace_ids, age, max_age):
+    # Only screenshot if on an active workspace; elsewhere the last thumbnail is the best we have
+    if client["workspace"]["id"] not in active_workspace_ids:
+        return False
+    return age is None or age >= max_age
+
+def take_screenshot(client, active_workspace_ids, max_age=THUMB_REFRESH):
+    filename = thumbnail_path(client)
+    age = cached_age(filename)
+
+    if not needs_capture(client, active_workspace_ids, age, max_age):
+        if age is None:
+            return client, None
+        os.utime(filename)  # mark as recently used
+        return client, filename
 
     # Construct geometry: X,Y WxH
     at = client["at"]
@@ -34,19 +79,276 @@ def take_screenshot(client, active_workspace_ids):
     # Grim expects specific format.
     # Note: hyprctl returns [x, y] and [w, h]
     geometry = f"{at[0]},{at[1]} {size[0]}x{size[1]}"
-    
-    filename = os.path.join(CACHE_DIR, f"{address}.png")
-    
+    # Let grim scale down to icon size, so only a small PNG ever hits the disk
+    scale = min(1.0, THUMB_SIZE / max(size[0], size[1], 1))
+
+    tmp_filename = f"{filename}.tmp"
     try:
-        # grim -g "GEOM" -l 0 output.png
-        # -l 0 for no compression (fastest)
-        subprocess.run(["grim", "-g", geometry, "-l", "0", filename], 
+        # grim -g "GEOM" -s SCALE output.png
+        subprocess.run(["grim", "-g", geometry, "-s", f"{scale:.4f}", tmp_filename],
                        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.replace(tmp_filename, filename)
         return client, filename
-    except subprocess.CalledProcessError:
-        return client, None
+    except (subprocess.CalledProcessError, OSError):
+        return client, filename if age is not None else None
+
+def read_ppm(data):
+    """Returns (width, height, offset of the RGB bytes) of a binary P6 image."""
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        end = pos
+        while end < len(data) and not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[pos:end])
+        pos = end
+    if fields[0] != b"P6" or fields[3] != b"255":
+        raise ValueError("grim did not return an 8-bit PPM")
+    # Exactly one whitespace byte separates the header from the pixels
+    return int(fields[1]), int(fields[2]), pos + 1
+
+def crop_and_shrink(data, offset, width, x0, y0, x1, y1):
+    """
+    Cuts the rectangle out of an RGB image and shrinks it by a whole factor so
+    its longest side fits THUMB_SIZE. Returns (width, height, rgb bytes).
+    """
+    step = max(1, -(-max(x1 - x0, y1 - y0) // THUMB_SIZE))
+    if np is not None:
+        # Box filter: average every step x step block
+        height = (len(data) - offset) // (width * 3)
+        image = np.frombuffer(data, dtype=np.uint8, offset=offset, count=width * height * 3).reshape(height, width, 3)
+        h, w = (y1 - y0) // step, (x1 - x0) // step
+        block = image[y0:y0 + h * step, x0:x0 + w * step].reshape(h, step, w, step, 3)
+        return w, h, block.mean(axis=(1, 3)).astype(np.uint8).tobytes()
+
+    # Without NumPy: keep every step-th pixel of every step-th row
+    view = memoryview(data)
+    stride = 3 * step
+    w = len(range(x0, x1, step))
+    rows = []
+    for y in range(y0, y1, step):
+        start = offset + (y * width + x0) * 3
+        segment = view[start:start + (x1 - x0) * 3]
+        row = bytearray(w * 3)
+        row[0::3] = segment[0::stride]
+        row[1::3] = segment[1::stride]
+        row[2::3] = segment[2::stride]
+        rows.append(row)
+    return w, len(rows), b"".join(rows)
+
+def write_png(filename, width, height, rgb):
+    def chunk(kind, payload):
+        return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", zlib.crc32(kind + payload))
+
+    row = width * 3
+    raw = b"".join(b"\0" + rgb[y * row:(y + 1) * row] for y in range(height))
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 1)))
+        f.write(chunk(b"IEND", b""))
+
+def capture_monitor(monitor, clients):
+    """
+    Grabs the monitor once, as a PPM on grim's stdout, and writes a thumbnail
+    for each client on it. Returns {address: filename} for those written.
+    """
+    scale = monitor.get("scale") or 1.0
+    logical_width = monitor["width"] / scale
+    logical_height = monitor["height"] / scale
+    if monitor.get("transform", 0) % 2 == 1:
+        # Rotated by 90 or 270 degrees: width and height are the mode's, before rotation
+        logical_width, logical_height = logical_height, logical_width
+    # Capture just large enough that the smallest client still fills a thumbnail
+    capture_scale = min(scale, max(THUMB_SIZE / max(c["size"][0], c["size"][1], 1) for c in clients))
+    try:
+        data = subprocess.run(["grim", "-o", monitor["name"], "-s", f"{capture_scale:.4f}", "-t", "ppm", "-"],
+                              check=True, capture_output=True).stdout
+        width, height, offset = read_ppm(data)
+    except (subprocess.CalledProcessError, OSError, ValueError, IndexError):
+        return {}
+    fx = width / logical_width
+    fy = height / logical_height
+
+    written = {}
+    for c in clients:
+        x0 = max(0, round((c["at"][0] - monitor["x"]) * fx))
+        y0 = max(0, round((c["at"][1] - monitor["y"]) * fy))
+        x1 = min(width, round((c["at"][0] - monitor["x"] + c["size"][0]) * fx))
+        y1 = min(height, round((c["at"][1] - monitor["y"] + c["size"][1]) * fy))
+        if x1 - x0 < 1 or y1 - y0 < 1:
+            continue
+        w, h, rgb = crop_and_shrink(data, offset, width, x0, y0, x1, y1)
+        if w < 1 or h < 1:
+            continue
+        filename = thumbnail_path(c)
+        try:
+            write_png(f"{filename}.tmp", w, h, rgb)
+            os.replace(f"{filename}.tmp", filename)
+        except OSError:
+            continue
+        written[c["address"]] = filename
+    return written
+
+def capture_thumbnails(monitors, clients, force=()):
+    """
+    Brings the thumbnails of visible clients up to date (those in force are
+    taken again regardless of age). Returns {address: filename or None}.
+    """
+    active_workspace_ids = {m["activeWorkspace"]["id"] for m in monitors if m["activeWorkspace"]}
+
+    def max_age(c):
+        return 0 if c["address"] in force else THUMB_REFRESH
+
+    if CAPTURE_MODE == "window":
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = executor.map(lambda c: take_screenshot(c, active_workspace_ids, max_age(c)), clients)
+            return {client["address"]: filename for client, filename in results}
+
+    thumbnails = {}
+    pending = {}  # monitor id -> clients to capture on it
+    for c in clients:
+        filename = thumbnail_path(c)
+        age = cached_age(filename)
+        if age is not None:
+            os.utime(filename)  # mark as recently used
+        thumbnails[c["address"]] = filename if age is not None else None
+        if needs_capture(c, active_workspace_ids, age, max_age(c)):
+            pending.setdefault(c["monitor"], []).append(c)
+
+    targets = [(m, pending[m["id"]]) for m in monitors if m["id"] in pending]
+    with ThreadPoolExecutor(max_workers=max(1, len(targets))) as executor:
+        for written in executor.map(lambda target: capture_monitor(*target), targets):
+            thumbnails.update(written)
+    return thumbnails
+
+def prune_cache(clients):
+    """
+    Drops thumbnails of closed windows and of old geometries, then the least
+    recently used ones until the cache fits in CACHE_MAX_BYTES.
+    """
+    current = {thumbnail_path(c) for c in clients}
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if not entry.name.endswith(".png"):
+            continue
+        if entry.path not in current:
+            # Closed window, or a geometry this window no longer has
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+def cached_thumbnail(client):
+    """Returns the thumbnail the daemon made for the client, if there is one."""
+    filename = thumbnail_path(client)
+    try:
+        os.utime(filename)  # mark as recently used
+        return filename
+    except OSError:
+        return None
+
+def daemon_running():
+    try:
+        with open(DAEMON_PID_FILE) as f:
+            pid = int(f.read())
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            args = f.read().split(b"\0")
+    except (OSError, ValueError):
+        return False
+    # A daemon that died leaves its pid file behind, and the pid may since belong to something else
+    script = os.path.basename(__file__).encode()
+    return b"--daemon" in args and any(os.path.basename(arg) == script for arg in args)
+
+def refresh_thumbnails(force=()):
+    """Captures every visible window whose thumbnail is stale (or listed in force)."""
+    try:
+        monitors, clients = query_hyprland()
+    except Exception:
+        return
+    valid_clients = [c for c in clients if c["mapped"] and c["pid"] > 0]
+    capture_thumbnails(monitors, valid_clients, force)
+    prune_cache(valid_clients)
+
+def run_daemon():
+    """
+    Follows Hyprland's event socket and keeps thumbnails warm, so the switcher
+    only has to read them. Visible windows are captured after every change in
+    what is on screen, and the window losing focus is captured again, since it
+    is usually the next one to leave view. Closed windows are dropped at once.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    events = hyprland_ipc.open_event_socket()
+    with open(DAEMON_PID_FILE, "w") as f:
+        f.write(str(os.getpid()))
+
+    refresh_thumbnails()
+    buffer = b""
+    focused = None
+    force = set()
+    deadline = None
+    try:
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            ready, _, _ = select.select([events], [], [], timeout)
+            if not ready:
+                refresh_thumbnails(force)
+                force.clear()
+                deadline = None
+                continue
+
+            data = events.recv(65536)
+            if not data:
+                break  # Hyprland exited
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                event, _, payload = line.decode(errors="replace").partition(">>")
+                if event == "activewindowv2":
+                    if focused:
+                        force.add(focused)
+                    focused = f"0x{payload}" if payload and payload != "," else None
+                elif event == "closewindow":
+                    for path in glob.glob(os.path.join(CACHE_DIR, f"0x{payload}-*.png")):
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+                    force.discard(f"0x{payload}")
+                    continue
+                elif event not in REFRESH_EVENTS:
+                    continue
+                # Changes come in bursts; capture once they've settled
+                deadline = time.monotonic() + DAEMON_SETTLE
+    finally:
+        try:
+            os.remove(DAEMON_PID_FILE)
+        except OSError:
+            pass
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--daemon":
+        run_daemon()
+        sys.exit(0)
+
     # If arguments are provided, it means a selection was made
     if len(sys.argv) > 1:
         selected = sys.argv[1]
@@ -84,24 +386,13 @@ def main():
             return
 
         # Activate window
-        subprocess.run(["hyprctl", "dispatch", "focuswindow", f"address:{address}"])
+        hyprland_ipc.dispatch("focuswindow", f"address:{address}")
         sys.exit(0)
 
-    # Ensure cache dir exists
-    if os.path.exists(CACHE_DIR):
-        # Optional: clean up old files? Or just overwrite.
-        # Overwrite is faster than checking.
-        pass
-    else:
-        os.makedirs(CACHE_DIR)
+    # Ensure cache dir exists; thumbnails in it are reused across runs
+    os.makedirs(CACHE_DIR, exist_ok=True)
 
     monitors, clients = get_hyprland_data()
-    
-    # Identify active workspaces
-    active_workspace_ids = set()
-    for m in monitors:
-        if m["activeWorkspace"]:
-            active_workspace_ids.add(m["activeWorkspace"]["id"])
 
     # Prepare for parallel execution
     # Filter clients to reasonable ones (mapped?)
@@ -111,43 +402,52 @@ def main():
     # We want to output lines for rofi immediately or batch?
     # Parallel is best.
     
+    # With the daemon running the thumbnails are already there: no grim on the way to the menu
+    warm = daemon_running()
+
+    if warm:
+        thumbnails = [(c, cached_thumbnail(c)) for c in valid_clients]
+    else:
+        captured = capture_thumbnails(monitors, valid_clients)
+        thumbnails = [(c, captured.get(c["address"])) for c in valid_clients]
+
     results = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(take_screenshot, c, active_workspace_ids): c for c in valid_clients}
-        for future in futures:
-            client, icon_path = future.result()
-            
-            # Format: 'Title'
-            # Icon: 'icon_path' or default app icon
-            # Info: 'address'
-            
-            title = client["title"]
-            clazz = client["class"]
-            address = client["address"]
-            
-            # Escape Pango markup in title/class if necessary
-            # Simple sanitization
-            title = title.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            clazz = clazz.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-            
-            display_str = f"{title} <span color='#666' size='small'>({clazz})</span>"
-            
-            icon_part = ""
-            if icon_path:
-                icon_part = f"\0icon\x1f{icon_path}"
-            else:
-                # Fallback to class name effectively (rofi looks up icon by name)
-                # Client class often works as icon name
-                icon_part = f"\0icon\x1f{client['class']}"
-
-            info_part = f"\x1finfo\x1f{address}"
-            
-            line = f"{display_str}{icon_part}{info_part}"
-            results.append(line)
+    for client, icon_path in thumbnails:
+        # Format: 'Title'
+        # Icon: 'icon_path' or default app icon
+        # Info: 'address'
+        
+        title = client["title"]
+        clazz = client["class"]
+        address = client["address"]
+        
+        # Escape Pango markup in title/class if necessary
+        # Simple sanitization
+        title = title.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        clazz = clazz.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        
+        display_str = f"{title} <span color='#666' size='small'>({clazz})</span>"
+        
+        icon_part = ""
+        if icon_path:
+            icon_part = f"\0icon\x1f{icon_path}"
+        else:
+            # Fallback to class name effectively (rofi looks up icon by name)
+            # Client class often works as icon name
+            icon_part = f"\0icon\x1f{client['class']}"
+
+        info_part = f"\x1finfo\x1f{address}"
+        
+        line = f"{display_str}{icon_part}{info_part}"
+        results.append(line)
 
     # Print all results
     for line in results:
         print(line)
+    sys.stdout.flush()
+
+    if not warm:
+        prune_cache(valid_clients)
 
 if __name__ == "__main__":
     main()
@@ -6,6 +6,18 @@ import subprocess
 import os
 import re
 import pathlib
+import struct
+import threading
+from collections import namedtuple
+
+try:
+    from jeepney import DBusAddress, MatchRule, HeaderFields, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    # Without jeepney the monitor falls back to polling bluetoothctl
+    open_dbus_connection = None
 
 # --- Configuration ---
 
@@ -15,8 +27,34 @@ PERSISTENT_FILE = os.path.join(
     os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")),
     "waybar/waybar-bt-battery.lastdev",
 )
+BLUEZ_BUS = "SYSTEM"  # bus bluetoothd lives on
+POLL_INTERVAL = 5  # seconds between bluetoothctl polls when D-Bus is unavailable
+SAFETY_POLL_INTERVAL = 600  # seconds between full BlueZ re-reads, in case a signal was missed
+SELECTION_CHECK_INTERVAL = 2  # seconds between checks of PERSISTENT_FILE for a new selection
+HISTORY_DIR = os.path.join(os.path.dirname(PERSISTENT_FILE), "waybar-bt-battery.history")
+HISTORY_MAX_RECORDS = 4096  # per device; the file is compacted to this once it holds twice as many
+DRAIN_MIN_SAMPLES = 3  # battery readings needed before a drain rate is trusted
+DRAIN_MIN_SPAN = 20 * 60  # seconds of connected time those readings must cover
+DRAIN_WARNING = 30 * 60  # seconds of estimated time left that add the "draining" class
+SUSPEND_GAP = 60  # seconds the wall clock may run ahead of the monotonic clock before it counts as a suspend
+PICKER_PROBE_TIMEOUT = 0.15  # seconds --select waits for device state before opening the menu
 # ---------------------
 
+BLUEZ_NAME = "org.bluez"
+DEVICE_INTERFACE = "org.bluez.Device1"
+BATTERY_INTERFACE = "org.bluez.Battery1"
+# The only properties the output depends on; RSSI, ManufacturerData etc. are ignored
+WATCHED_PROPERTIES = {"Connected", "Alias", "Address", "Percentage"}
+SIGNAL_BURST = 0.05  # seconds to collect a burst of signals (e.g. a disconnect) before printing
+ALL_DEVICES = "all"  # PERSISTENT_FILE value: follow every connected device that reports a battery
+ALL_DEVICES_ENTRY = "All connected devices"
+
+DeviceInfo = namedtuple("DeviceInfo", "mac alias battery connected")
+
+# History record: unix time, percent (HISTORY_PAUSED marks a disconnect)
+HISTORY_RECORD = struct.Struct("<IB")
+HISTORY_PAUSED = 0xFF
+
 
 def get_bluetooth_devices():
     """
@@ -42,17 +80,31 @@ def get_bluetooth_devices():
 
 def select_device():
     """
-    Shows a menu to select a bluetooth device using MENU_COMMAND.
-    Saves the selected MAC to PERSISTENT_FILE.
+    Shows a menu to select bluetooth devices using MENU_COMMAND.
+    Picking a device adds it to (or removes it from) the tracked set in
+    PERSISTENT_FILE; the first entry tracks all connected devices instead.
     """
-    devices = get_bluetooth_devices()
+    devices, status = probe_devices(time.monotonic() + PICKER_PROBE_TIMEOUT)
     if not devices:
         return
+    targets = get_target_devices()
+    tracked = targets if isinstance(targets, list) else []
 
-    # Create menu entries in format: "Name (MAC)"
-    menu_entries = []
+    # Create menu entries in format: "Name [state] (MAC)", tracked devices marked.
+    # Devices that didn't answer in time are listed without a state.
+    menu_entries = [ALL_DEVICES_ENTRY]
     for mac, name in devices:
-        menu_entries.append(f"{name} ({mac})")
+        mark = "● " if mac in tracked else ""
+        info = status.get(mac)
+        state = ""
+        if info is not None and info.alias is not None:
+            if not info.connected:
+                state = " [disconnected]"
+            elif info.battery is not None:
+                state = f" [connected, {info.battery}%]"
+            else:
+                state = " [connected]"
+        menu_entries.append(f"{mark}{name}{state} ({mac})")
 
     menu_input = "\n".join(menu_entries).encode("utf-8")
 
@@ -62,32 +114,99 @@ def select_device():
         )
         selected_entry = process.stdout.decode("utf-8").strip()
 
+        if selected_entry == ALL_DEVICES_ENTRY:
+            save_target_devices(ALL_DEVICES)
+
         # Parse "Name (MAC)" to extract just the MAC address
         # We assume the format ends with (MAC). We use rsplit to handle names with parens.
-        if selected_entry and "(" in selected_entry:
+        elif selected_entry and "(" in selected_entry:
             mac = selected_entry.rsplit("(", 1)[1].strip(")")
 
             # Basic validation to ensure we grabbed a MAC
             if len(mac.split(":")) == 6:
-                try:
-                    pathlib.Path(os.path.dirname(PERSISTENT_FILE)).mkdir(
-                        parents=True, exist_ok=True
-                    )
-                    with open(PERSISTENT_FILE, "w") as pf:
-                        pf.write(mac)
-                except Exception:
-                    pass
+                if mac in tracked:
+                    tracked.remove(mac)
+                else:
+                    tracked.append(mac)
+                save_target_devices(tracked)
 
     except (subprocess.CalledProcessError, FileNotFoundError):
         pass
 
 
-def get_target_device_mac():
-    """Reads the selected MAC address from persistent file."""
-    if os.path.exists(PERSISTENT_FILE):
-        with open(PERSISTENT_FILE, "r") as f:
-            return f.read().strip()
-    return None
+def probe_devices(deadline):
+    """
+    Lists paired devices with their state for the picker, giving up on
+    anything that isn't known by deadline (a time.monotonic() value).
+    Returns ([(mac, name)], {mac: DeviceInfo}).
+    """
+    if open_dbus_connection is not None:
+        # One GetManagedObjects answers for every device at once
+        try:
+            conn = open_dbus_connection(bus=BLUEZ_BUS, auth_timeout=PICKER_PROBE_TIMEOUT)
+        except Exception:
+            conn = None
+        if conn is not None:
+            try:
+                state = BluezState(conn)
+                if state.load(timeout=max(0.01, deadline - time.monotonic())):
+                    devices = sorted(((device["address"], device["alias"] or device["address"])
+                                      for device in state.devices.values() if device["address"]),
+                                     key=lambda device: device[1].lower())
+                    macs = [mac for mac, name in devices]
+                    return devices, {device.mac: device for device in state.get_devices(macs) or []}
+            finally:
+                conn.close()
+
+    # bluetoothctl: one 'info' per device, all at once, collecting whatever is back in time
+    devices = get_bluetooth_devices()
+    status = {}
+
+    def probe(mac):
+        status[mac] = DeviceInfo(mac, *get_device_info(mac))
+
+    threads = [threading.Thread(target=probe, args=(mac,), daemon=True) for mac, name in devices]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0, deadline - time.monotonic()))
+    return devices, dict(status)
+
+
+def save_target_devices(targets):
+    """Writes ALL_DEVICES or a list of MACs (one per line) to PERSISTENT_FILE."""
+    try:
+        pathlib.Path(os.path.dirname(PERSISTENT_FILE)).mkdir(parents=True, exist_ok=True)
+        with open(PERSISTENT_FILE, "w") as pf:
+            pf.write(targets if targets == ALL_DEVICES else "\n".join(targets))
+    except Exception:
+        pass
+
+
+def get_target_devices():
+    """
+    Reads the selection from persistent file.
+    Returns ALL_DEVICES, a list of MACs, or None if nothing is selected.
+    """
+    if not os.path.exists(PERSISTENT_FILE):
+        return None
+    with open(PERSISTENT_FILE, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if lines == [ALL_DEVICES]:
+        return ALL_DEVICES
+    macs = [line for line in lines if len(line.split(":")) == 6]
+    return macs or None
+
+
+def get_connected_macs():
+    """Returns the MACs of all connected devices, from 'bluetoothctl devices Connected'."""
+    try:
+        result = subprocess.run(
+            ["bluetoothctl", "devices", "Connected"], capture_output=True, text=True, check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return []
+    return [line.split()[1] for line in result.stdout.splitlines() if line.startswith("Device ")]
 
 
 def get_device_info(mac):
@@ -123,6 +242,21 @@ def get_device_info(mac):
         return None, None, False
 
 
+def get_devices(targets):
+    """
+    Queries bluetoothctl for the tracked devices.
+    Returns a list of DeviceInfo, or None if bluetoothctl could not be queried.
+    """
+    macs = get_connected_macs() if targets == ALL_DEVICES else targets
+    devices = [DeviceInfo(mac, *get_device_info(mac)) for mac in macs]
+    if devices and all(device.alias is None for device in devices):
+        return None
+    devices = [device._replace(alias=device.alias or device.mac) for device in devices]
+    if targets == ALL_DEVICES:
+        devices = [device for device in devices if device.battery is not None]
+    return devices
+
+
 def get_battery_icon(percent):
     """Returns a battery icon based on percentage."""
     if percent is None:
@@ -138,56 +272,431 @@ def get_battery_icon(percent):
     return ""
 
 
-def main():
-    # Handle interface selection argument
-    if len(sys.argv) > 1 and sys.argv[1] == "--select":
-        select_device()
-        sys.exit(0)
+class DrainEstimator:
+    """
+    Running least-squares fit of battery percent against connected time
+    for the current discharge. Time spent disconnected is cut out of the
+    clock, and a reading higher than the last one (charged) starts over.
+    """
 
-    # Main monitoring loop
-    while True:
+    def __init__(self):
+        self.offset = 0.0  # disconnected seconds cut out so far
+        self.paused_at = None
+        self.last_percent = None
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.origin = None
+        self.sum_t = self.sum_p = self.sum_tt = self.sum_tp = 0.0
+        self.span = 0.0
+
+    def add(self, timestamp, percent):
+        if percent == HISTORY_PAUSED:
+            if self.paused_at is None:
+                self.paused_at = timestamp
+            return
+        if self.paused_at is not None:
+            self.offset += max(0, timestamp - self.paused_at)
+            self.paused_at = None
+        if self.last_percent is not None and percent > self.last_percent:
+            self.reset()
+        self.last_percent = percent
+
+        active = timestamp - self.offset
+        if self.origin is None:
+            self.origin = active
+        # Hours since the start of the discharge keep the sums small
+        t = (active - self.origin) / 3600
+        self.n += 1
+        self.sum_t += t
+        self.sum_p += percent
+        self.sum_tt += t * t
+        self.sum_tp += t * percent
+        self.span = active - self.origin
+
+    def rate(self):
+        """Drain in percent per hour, or None while there is too little data."""
+        if self.n < DRAIN_MIN_SAMPLES or self.span < DRAIN_MIN_SPAN:
+            return None
+        denominator = self.n * self.sum_tt - self.sum_t * self.sum_t
+        if denominator <= 0:
+            return None
+        slope = (self.n * self.sum_tp - self.sum_t * self.sum_p) / denominator
+        return -slope if slope < 0 else None
+
+
+class BatteryHistory:
+    """
+    Append-only (timestamp, percent) log for one device in HISTORY_DIR,
+    replayed into a DrainEstimator on start. A record is only written when
+    the percent changes or the device comes and goes, so writes are rare.
+    Time nobody was watching (logged out, waybar restarted) is cut out by
+    pausing at the last record on load.
+    """
+
+    def __init__(self, mac):
+        self.path = os.path.join(HISTORY_DIR, mac.replace(":", "_") + ".bin")
+        self.estimator = DrainEstimator()
+        self.records = 0
+        self.last = None
         try:
-            target_mac = get_target_device_mac()
-
-            if not target_mac:
-                output = {
-                    "text": " Select",
-                    "tooltip": "No device selected. Click to choose a Bluetooth device.",
-                }
-                print(json.dumps(output), flush=True)
-                time.sleep(3)
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        usable = len(data) - len(data) % HISTORY_RECORD.size
+        timestamp = None
+        for timestamp, percent in HISTORY_RECORD.iter_unpack(data[:usable]):
+            self.estimator.add(timestamp, percent)
+            self.last = percent
+            self.records += 1
+        if usable != len(data) or self.records > 2 * HISTORY_MAX_RECORDS:
+            self.compact(data[:usable])
+        if self.last not in (None, HISTORY_PAUSED):
+            self.record(HISTORY_PAUSED, timestamp)
+
+    def compact(self, data):
+        """Rewrites the file with only the newest HISTORY_MAX_RECORDS records."""
+        keep = data[-HISTORY_MAX_RECORDS * HISTORY_RECORD.size:]
+        try:
+            pathlib.Path(HISTORY_DIR).mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(keep)
+            os.replace(tmp_path, self.path)
+            self.records = len(keep) // HISTORY_RECORD.size
+        except OSError:
+            pass
+
+    def record(self, percent, timestamp=None):
+        if percent == self.last:
+            return
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        self.estimator.add(timestamp, percent)
+        self.last = percent
+        try:
+            pathlib.Path(HISTORY_DIR).mkdir(parents=True, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(HISTORY_RECORD.pack(timestamp, percent))
+        except OSError:
+            return
+        self.records += 1
+        if self.records > 2 * HISTORY_MAX_RECORDS:
+            with open(self.path, "rb") as f:
+                self.compact(f.read())
+
+    def remaining(self):
+        """Returns (seconds left, percent per hour), both None without an estimate."""
+        rate = self.estimator.rate()
+        if rate is None or self.last in (None, HISTORY_PAUSED):
+            return None, None
+        return self.last / rate * 3600, rate
+
+
+class DrainTracker:
+    """BatteryHistory per device, fed from each round of DeviceInfo."""
+
+    def __init__(self):
+        self.histories = {}
+        self.clock = (time.time(), time.monotonic())
+
+    def observe(self, devices):
+        wall, monotonic = time.time(), time.monotonic()
+        last_wall, last_monotonic = self.clock
+        self.clock = (wall, monotonic)
+        if (wall - last_wall) - (monotonic - last_monotonic) > SUSPEND_GAP:
+            # The monotonic clock stood still: the machine was suspended since
+            # the last round. Pause every device for that long, so the gap
+            # doesn't count as connected time.
+            suspended_at = last_wall + (monotonic - last_monotonic)
+            for history in self.histories.values():
+                history.record(HISTORY_PAUSED, suspended_at)
+        seen = set()
+        for device in devices:
+            if device.battery is None and device.connected:
                 continue
+            history = self.histories.get(device.mac)
+            if history is None:
+                history = self.histories[device.mac] = BatteryHistory(device.mac)
+            history.record(device.battery if device.connected else HISTORY_PAUSED)
+            seen.add(device.mac)
+        # Devices that dropped out of the list ("all" mode) have disconnected
+        for mac, history in self.histories.items():
+            if mac not in seen:
+                history.record(HISTORY_PAUSED)
+
+    def remaining(self, mac):
+        history = self.histories.get(mac)
+        return history.remaining() if history else (None, None)
+
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes >= 60:
+        return f"{minutes // 60}h {minutes % 60:02d}m"
+    return f"{minutes}m"
 
-            alias, battery, connected = get_device_info(target_mac)
-
-            if alias is None:
-                # Command failed (bluetooth service likely down)
-                output = {"text": "⚠ Error", "tooltip": "Could not query bluetoothctl"}
-            elif not connected:
-                output = {
-                    "text": " Disconnected",
-                    "class": "disconnected",
-                    "tooltip": f"{alias}\nMAC: {target_mac}\nStatus: Disconnected",
-                }
+
+class BluezState:
+    """
+    In-memory copy of BlueZ's Device1/Battery1 properties, keyed by object
+    path. Loaded once with GetManagedObjects and then kept current from the
+    signals bluetoothd emits, so nothing is queried while devices are idle.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        # object path -> {"address", "alias", "connected", "battery"}
+        self.devices = {}
+
+    def subscribe(self):
+        # bluetoothd restarting drops every object without further signals
+        restarted = MatchRule(type="signal", sender="org.freedesktop.DBus", interface="org.freedesktop.DBus",
+                              member="NameOwnerChanged")
+        restarted.add_arg_condition(0, BLUEZ_NAME)
+        for rule in (
+            MatchRule(type="signal", sender=BLUEZ_NAME, interface="org.freedesktop.DBus.Properties",
+                      member="PropertiesChanged", path_namespace="/org/bluez"),
+            MatchRule(type="signal", sender=BLUEZ_NAME, interface="org.freedesktop.DBus.ObjectManager"),
+            restarted,
+        ):
+            self.conn.send_and_get_reply(message_bus.AddMatch(rule))
+
+    def load(self, timeout=None):
+        """Re-reads every device from bluetoothd, returns False if it could not be asked."""
+        address = DBusAddress("/", bus_name=BLUEZ_NAME, interface="org.freedesktop.DBus.ObjectManager")
+        self.devices = {}
+        try:
+            objects = unwrap_msg(self.conn.send_and_get_reply(new_method_call(address, "GetManagedObjects"),
+                                                              timeout=timeout))[0]
+        except Exception:
+            # bluetoothd not running (yet); NameOwnerChanged will tell us when it is
+            return False
+        for path, interfaces in objects.items():
+            self.update(path, interfaces)
+        return True
+
+    def update(self, path, interfaces):
+        """Applies {interface: {property: (signature, value)}} to the device at path."""
+        device = self.devices.get(path)
+        if device is None:
+            if DEVICE_INTERFACE not in interfaces:
+                return
+            device = self.devices[path] = {"address": None, "alias": None, "connected": False, "battery": None}
+        props = interfaces.get(DEVICE_INTERFACE, {})
+        if "Address" in props:
+            device["address"] = props["Address"][1]
+        if "Alias" in props:
+            device["alias"] = props["Alias"][1]
+        if "Connected" in props:
+            device["connected"] = bool(props["Connected"][1])
+        if "Percentage" in interfaces.get(BATTERY_INTERFACE, {}):
+            device["battery"] = int(interfaces[BATTERY_INTERFACE]["Percentage"][1])
+
+    def apply(self, msg):
+        """Updates the state from a signal, returns True if anything may have changed."""
+        member = msg.header.fields.get(HeaderFields.member)
+        path = msg.header.fields.get(HeaderFields.path)
+        if member == "PropertiesChanged":
+            interface, changed, invalidated = msg.body
+            if interface not in (DEVICE_INTERFACE, BATTERY_INTERFACE):
+                return False
+            if WATCHED_PROPERTIES.isdisjoint(changed):
+                # Advertising noise during discovery
+                return False
+            self.update(path, {interface: changed})
+            return True
+        if member == "InterfacesAdded":
+            path, interfaces = msg.body
+            self.update(path, interfaces)
+            return True
+        if member == "InterfacesRemoved":
+            path, interfaces = msg.body
+            if DEVICE_INTERFACE in interfaces:
+                self.devices.pop(path, None)
+            elif BATTERY_INTERFACE in interfaces and path in self.devices:
+                # Battery1 goes away when the device disconnects
+                self.devices[path]["battery"] = None
+            return True
+        if member == "NameOwnerChanged":
+            self.load()
+            return True
+        return False
+
+    def get_devices(self, targets):
+        """Same result as get_devices(), from the cached state."""
+        if not self.devices:
+            return None
+        by_mac = {(device["address"] or "").upper(): device for device in self.devices.values()}
+        if targets == ALL_DEVICES:
+            macs = sorted(mac for mac, device in by_mac.items()
+                          if device["connected"] and device["battery"] is not None)
+        else:
+            macs = targets
+        devices = []
+        for mac in macs:
+            device = by_mac.get(mac.upper())
+            if device is None:
+                devices.append(DeviceInfo(mac, mac, None, False))
+            else:
+                devices.append(DeviceInfo(mac, device["alias"] or mac, device["battery"], device["connected"]))
+        return devices
+
+
+def format_output(targets, devices, source="bluetoothctl", drain=None):
+    """
+    Builds the waybar output for the tracked devices: the bar shows the
+    lowest battery, the tooltip every device with its estimated time left
+    from the DrainTracker.
+    """
+    def time_left(device):
+        if drain is None or not device.connected or device.battery is None:
+            return None, None
+        return drain.remaining(device.mac)
+
+    if not targets:
+        return {
+            "text": " Select",
+            "tooltip": "No device selected. Click to choose a Bluetooth device.",
+        }
+    if devices is None:
+        # Query failed (bluetooth service likely down)
+        return {"text": "⚠ Error", "tooltip": f"Could not query {source}"}
+    if not devices:
+        return {
+            "text": " None",
+            "class": "disconnected",
+            "tooltip": "No connected device reports its battery",
+        }
+
+    if len(devices) == 1:
+        mac, alias, battery, connected = devices[0]
+        if not connected:
+            status = "Status: Disconnected"
+        elif battery is not None:
+            status = f"Battery: {battery}%"
+            seconds, rate = time_left(devices[0])
+            if seconds is not None:
+                status += f"\nTime left: ~{format_duration(seconds)} ({rate:.1f}%/h)"
+        else:
+            status = "No battery data available"
+        tooltip = f"{alias}\nMAC: {mac}\n{status}"
+    else:
+        lines = []
+        for mac, alias, battery, connected in devices:
+            if not connected:
+                status = "Disconnected"
             elif battery is not None:
-                icon = get_battery_icon(battery)
-                output = {
-                    "text": f"{icon} {battery}%",
-                    "class": "connected",
-                    "tooltip": f"{alias}\nMAC: {target_mac}\nBattery: {battery}%",
-                }
+                status = f"{get_battery_icon(battery)} {battery}%"
+                seconds, rate = time_left(DeviceInfo(mac, alias, battery, connected))
+                if seconds is not None:
+                    status += f" (~{format_duration(seconds)} left)"
             else:
-                # Connected but device not reporting battery (yet)
-                output = {
-                    "text": f" {alias}",
-                    "class": "connected",
-                    "tooltip": f"{alias}\nMAC: {target_mac}\nNo battery data available",
-                }
+                status = "No battery data"
+            lines.append(f"{alias}: {status}")
+        tooltip = "\n".join(lines)
+
+    connected = [device for device in devices if device.connected]
+    reporting = [device for device in connected if device.battery is not None]
+    if reporting:
+        lowest = min(reporting, key=lambda device: device.battery)
+        text = f"{get_battery_icon(lowest.battery)} {lowest.battery}%"
+    elif connected:
+        # Connected but device not reporting battery (yet)
+        text = f" {connected[0].alias}"
+    else:
+        return {"text": " Disconnected", "class": "disconnected", "tooltip": tooltip}
+    estimates = [time_left(device)[0] for device in reporting]
+    if any(seconds is not None and seconds < DRAIN_WARNING for seconds in estimates):
+        return {"text": text, "class": ["connected", "draining"], "tooltip": tooltip}
+    return {"text": text, "class": "connected", "tooltip": tooltip}
+
+
+def selection_stamp():
+    """Modification time of PERSISTENT_FILE, to notice a new --select cheaply."""
+    try:
+        return os.stat(PERSISTENT_FILE).st_mtime_ns
+    except OSError:
+        return None
 
-            print(json.dumps(output), flush=True)
 
-            # Update every 3 seconds
-            time.sleep(5)
+def watch_bluez():
+    """
+    Event-driven monitor: waits on BlueZ signals and prints as soon as the
+    tracked devices' state changes. Raises if the bus goes away.
+    """
+    conn = open_dbus_connection(bus=BLUEZ_BUS)
+    try:
+        state = BluezState(conn)
+        with conn.filter(MatchRule(type="signal")) as signals:
+            state.subscribe()
+            state.load()
+            next_load = time.monotonic() + SAFETY_POLL_INTERVAL
+            stamp = selection_stamp()
+            targets = get_target_devices()
+            drain = DrainTracker()
+            last_line = None
+            while True:
+                devices = state.get_devices(targets) if targets else []
+                if devices is not None:
+                    # Also with an empty list, so the last device to disconnect is paused
+                    drain.observe(devices)
+                line = json.dumps(format_output(targets, devices, source="BlueZ", drain=drain))
+                if line != last_line:
+                    print(line, flush=True)
+                    last_line = line
+
+                # Sleep until a relevant signal arrives, the selection may have changed or the safety poll is due.
+                # Irrelevant signals (RSSI during discovery) only wake us up to wait again.
+                next_check = time.monotonic() + SELECTION_CHECK_INTERVAL
+                changed = False
+                while not changed and time.monotonic() < min(next_check, next_load):
+                    try:
+                        msg = conn.recv_until_filtered(
+                            signals, timeout=max(0, min(next_check, next_load) - time.monotonic())
+                        )
+                    except TimeoutError:
+                        break
+                    changed = state.apply(msg)
+
+                if changed:
+                    # A disconnect comes as several signals; take them together so the bar doesn't flicker,
+                    # but never wait past one fixed deadline however many signals keep coming
+                    burst_end = time.monotonic() + SIGNAL_BURST
+                    while time.monotonic() < burst_end:
+                        try:
+                            state.apply(conn.recv_until_filtered(signals, timeout=burst_end - time.monotonic()))
+                        except TimeoutError:
+                            break
+                if time.monotonic() >= next_load:
+                    state.load()
+                    next_load = time.monotonic() + SAFETY_POLL_INTERVAL
+                if selection_stamp() != stamp:
+                    stamp = selection_stamp()
+                    targets = get_target_devices()
+    finally:
+        conn.close()
+
+
+def poll_bluetoothctl():
+    drain = DrainTracker()
+    while True:
+        try:
+            targets = get_target_devices()
+
+            if not targets:
+                print(json.dumps(format_output(None, [])), flush=True)
+                time.sleep(3)
+                continue
+
+            devices = get_devices(targets)
+            if devices is not None:
+                # Also with an empty list, so the last device to disconnect is paused
+                drain.observe(devices)
+            output = format_output(targets, devices, drain=drain)
+            print(json.dumps(output), flush=True)
+            time.sleep(POLL_INTERVAL)
 
         except (KeyboardInterrupt, SystemExit):
             break
@@ -197,5 +706,22 @@ def main():
             time.sleep(3)
 
 
+def main():
+    # Handle interface selection argument
+    if len(sys.argv) > 1 and sys.argv[1] == "--select":
+        select_device()
+        sys.exit(0)
+
+    if open_dbus_connection is not None:
+        try:
+            watch_bluez()
+        except (KeyboardInterrupt, SystemExit):
+            return
+        except Exception:
+            # No usable system bus; poll instead
+            pass
+    poll_bluetoothctl()
+
+
 if __name__ == "__main__":
     main()
@@ -1,8 +1,40 @@
 #!/usr/bin/env python3
+import glob
+import heapq
 import json
-import subprocess
 import sys
 import os
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# --- Configuration ---
+HISTORY_SIZE = 60  # samples kept per core for the tooltip sparkline
+COMPACT_CORES = 16  # above this many cores the tooltip shows a heatmap instead of one line per core
+HEATMAP_ROW = 16  # cores per heatmap row
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+TOP_PROCESSES = 5  # processes listed in the tooltip, 0 to disable
+TOP_PROCESSES_INTERVAL = 5  # seconds between /proc scans for the process list
+TOOLTIP_INTERVAL = 5  # seconds between tooltip-only updates; text or class changes go out at once
+
+# Adaptive sampling: back off while the system is idle and stable,
+# return to MIN_INTERVAL as soon as usage or temperature gets busy.
+ADAPTIVE_INTERVAL = True
+MIN_INTERVAL = 1.0  # seconds
+MAX_INTERVAL = 5.0  # seconds
+IDLE_USAGE = 15.0  # % total usage below which the system counts as idle
+STABLE_DELTA = 5.0  # max % change between samples to count as stable
+BUSY_USAGE = 50.0  # % total usage that snaps back to MIN_INTERVAL
+BUSY_TEMP = 60.0  # °C that snaps back to MIN_INTERVAL
+
+# Pressure Stall Information: "some" avg10 stall % that escalates the class
+PSI_WARNING = 10.0
+PSI_CRITICAL = 40.0
+# ---------------------
 
 def get_cpu_model():
     try:
@@ -14,151 +46,520 @@ def get_cpu_model():
         return "Unknown CPU"
     return "Unknown CPU"
 
-def get_cpu_temp():
-    try:
-        # Try k10temp (AMD) Tctl first
-        sensors = subprocess.check_output(['sensors'], text=True)
-        
-        # Look for Tccd1 or Tccd2 (Actual Die Temp) first, then Tctl
-        lines = sensors.splitlines()
-        
-        # Priority list of labels to look for
-        priorities = ["Tccd1:", "Tccd2:", "Tdie:", "Tctl:"]
-        
-        for label in priorities:
-            for line in lines:
-                if label in line:
-                     parts = line.split()
-                     for part in parts:
-                         if part.startswith('+') and part.endswith('°C'):
-                             return part.replace('+', '').replace('°C', '')
-        
+class HwmonTemp:
+    """
+    Reads the CPU temperature straight from a hwmon temp*_input file.
+    The file is located once (by temp*_label priority) and kept open,
+    rescanning only when the device goes away.
+    """
+
+    # Priority list of labels to look for: actual die temp first, then Tctl
+    PRIORITIES = ["Tccd1", "Tccd2", "Tdie", "Tctl"]
+    RESCAN_INTERVAL = 30
+
+    def __init__(self):
+        self.file = None
+        self.last_scan = None
+        self.rescan()
+
+    def find_input(self):
+        """Returns the path of the best temp*_input file, or None."""
+        labels = {}
+        for label_path in glob.glob('/sys/class/hwmon/hwmon*/temp*_label'):
+            try:
+                with open(label_path, 'r') as f:
+                    labels.setdefault(f.read().strip(), label_path)
+            except OSError:
+                continue
+
+        for label in self.PRIORITIES:
+            if label in labels:
+                return labels[label].replace('_label', '_input')
+
         # Fallback to any temp1
-        for line in lines:
-             if "temp1:" in line:
-                 parts = line.split()
-                 for part in parts:
-                     if part.startswith('+') and part.endswith('°C'):
-                         return part.replace('+', '').replace('°C', '')
-
-    except Exception:
+        candidates = sorted(glob.glob('/sys/class/hwmon/hwmon*/temp1_input'))
+        return candidates[0] if candidates else None
+
+    def rescan(self):
+        self.close()
+        self.last_scan = time.monotonic()
+        path = self.find_input()
+        if path:
+            try:
+                self.file = open(path, 'rb', buffering=0)
+            except OSError:
+                self.file = None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def read(self):
+        """Returns the temperature in °C as a string, or 'N/A'."""
+        if self.file is None:
+            if time.monotonic() - self.last_scan < self.RESCAN_INTERVAL:
+                return "N/A"
+            self.rescan()
+            if self.file is None:
+                return "N/A"
+
+        for attempt in range(2):
+            try:
+                self.file.seek(0)
+                millideg = int(self.file.read())
+                return f"{millideg / 1000:.1f}"
+            except (OSError, ValueError):
+                # Device disappeared (e.g. driver reload), look for it again
+                self.rescan()
+                if self.file is None:
+                    break
         return "N/A"
-    return "N/A"
 
-def get_cpu_usage_and_cores():
-    usage_data = {}
-    try:
-        # Get usage for all cores
-        # mpstat -P ALL 1 1
-        # The output might be localized (commas instead of dots)
-        
-        # Run mpstat for 1 second interval, 1 count to get current usage
-        result = subprocess.run(['mpstat', '-P', 'ALL', '1', '1'], capture_output=True, text=True)
-        lines = result.stdout.strip().splitlines()
-        
-        # We need to find the "Average:" block or the second report block
-        # The first block is since boot, second is the 1-second interval
-        
-        relevant_lines = []
-        capture = False
-        
-        # Check if "Average:" exists
-        has_average = any("Average:" in line for line in lines)
-        
-        if has_average:
-            for line in lines:
-                if "Average:" in line and "CPU" in line:
-                    capture = True
-                    continue # Skip header
-                if capture and line.strip():
-                     relevant_lines.append(line)
+def usage_glyphs(values):
+    """Maps 0-100 usage values to one block glyph each."""
+    top = len(SPARK_CHARS) - 1
+    if np is not None:
+        idx = (np.clip(values, 0.0, 100.0) * (top / 100.0) + 0.5).astype(np.intp)
+        return "".join(map(SPARK_CHARS.__getitem__, idx.tolist()))
+    return "".join(SPARK_CHARS[min(top, max(0, int(v * top / 100.0 + 0.5)))] for v in values)
+
+
+class CpuSampler:
+    """
+    Computes total and per-core CPU usage from /proc/stat jiffy deltas.
+    Keeps the previous counters in memory so each call returns immediately.
+    All cpu lines are converted and diffed in one array operation (NumPy
+    when available, the stdlib array module otherwise).
+    """
+
+    STAT_PATH = '/proc/stat'
+
+    def __init__(self):
+        # 'all' followed by the core ids, in /proc/stat order
+        self.names = []
+        self.prev_idle = None
+        self.prev_total = None
+        self.sample()
+
+    def read_counters(self):
+        with open(self.STAT_PATH, 'rb') as f:
+            data = f.read()
+        # The cpu lines come first; cut right after the last one
+        block = data[:data.find(b'\n', data.rfind(b'\ncpu') + 1)]
+        width = block.find(b'\n')
+        fields = len(block[:width].split()) if width != -1 else len(block.split())
+
+        if np is not None:
+            # Turn "cpu"/"cpuN" into a numeric id column (-1 for the total)
+            # so the whole block parses in a single C call
+            text = block.replace(b'cpu ', b'cpu-1 ', 1).replace(b'cpu', b'')
+            counters = np.fromstring(text, dtype=np.int64, sep=' ').reshape(-1, fields)
+            if len(counters) != len(self.names):
+                self.names = ['all'] + [str(n) for n in counters[1:, 0].tolist()]
+                self.prev_idle = self.prev_total = None
+            # Columns: id user nice system idle iowait irq softirq steal (guest is already in user)
+            return counters[:, 4] + counters[:, 5], counters[:, 1:9].sum(axis=1)
+
+        tokens = block.split()
+        names = tokens[::fields]
+        if len(names) != len(self.names):
+            self.names = [n[3:].decode() or 'all' for n in names]
+            self.prev_idle = self.prev_total = None
+        del tokens[::fields]
+
+        # Columns: user nice system idle iowait irq softirq steal (guest is already in user)
+        counters = array('q', map(int, tokens))
+        step = fields - 1
+        idle = array('q', (counters[i + 3] + counters[i + 4] for i in range(0, len(counters), step)))
+        total = array('q', (sum(counters[i:i + 8]) for i in range(0, len(counters), step)))
+        return idle, total
+
+    def sample(self):
+        """
+        Returns usage per cpu line as a float array: index 0 is the total,
+        then one entry per core matching self.names[1:].
+        """
+        idle, total = self.read_counters()
+        prev_idle, prev_total = self.prev_idle, self.prev_total
+        self.prev_idle, self.prev_total = idle, total
+
+        if np is not None:
+            if prev_total is None:
+                return np.zeros(len(total), dtype=np.float32)
+            d_total = total - prev_total
+            d_busy = d_total - (idle - prev_idle)
+            return np.where(d_total > 0, 100.0 * d_busy / np.maximum(d_total, 1), 0.0).astype(np.float32)
+
+        if prev_total is None:
+            return array('f', bytes(4 * len(total)))
+        usage = array('f', bytes(4 * len(total)))
+        for i in range(len(total)):
+            d_total = total[i] - prev_total[i]
+            if d_total > 0:
+                usage[i] = 100.0 * (d_total - (idle[i] - prev_idle[i])) / d_total
+        return usage
+
+
+class UsageHistory:
+    """
+    Fixed-size ring buffer of usage samples for every cpu line.
+    Backed by one preallocated samples x cpus float buffer; pushing a tick
+    overwrites a single row in place.
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self.width = 0
+        self.buf = None
+        self.pos = 0
+        self.count = 0
+
+    def push(self, usage):
+        width = len(usage)
+        if width != self.width:
+            # First sample, or cpus were hotplugged: start over
+            self.width = width
+            self.pos = self.count = 0
+            if np is not None:
+                self.buf = np.zeros((self.size, width), dtype=np.float32)
+            else:
+                self.buf = array('f', bytes(4 * self.size * width))
+
+        if np is not None:
+            self.buf[self.pos] = usage
         else:
-             # If no Average (some versions?), use the last set of CPU lines
-             # Find the last "CPU" header index
-             last_header_idx = -1
-             for i, line in enumerate(lines):
-                  if "CPU" in line and "%idle" in line:
-                      last_header_idx = i
-             
-             if last_header_idx != -1:
-                 for line in lines[last_header_idx+1:]:
-                      if line.strip():
-                          relevant_lines.append(line)
-
-        formatted_usage = {}
-        
-        for line in relevant_lines:
-            parts = line.split()
-            # Average:     all    ...
-            # Average:       0    ...
-            
-            # Find the CPU identifier column. It's usually the column after AM/PM or Average:
-            # But simpler: if line has 'all', it's total. If it has a number, it's a core.
-            
-            cpu_id = None
-            idle_val = None
-            
-            # Identify CPU column index dynamically
-            # It is the column that contains 'all' or digits
-            
-            # Standard `mpstat 1 1` line:
-            # 06:08:47 PM  CPU    %usr   ...   %idle
-            # 06:08:48 PM  all    0.50   ...   99.50
-            # Average:     all    0.50   ...   99.50
-
-            idx_cpu = -1
-            for k, part in enumerate(parts):
-                 if part == "all" or part.isdigit():
-                      idx_cpu = k
-                      break
-            
-            if idx_cpu == -1: continue
-            
-            cpu_name = parts[idx_cpu]
-            
-            # %idle is the last column
-            idle_str = parts[-1].replace(',', '.')
-            
+            self.buf[self.pos * width:(self.pos + 1) * width] = usage
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def ordered(self, index):
+        """Returns the samples of one cpu line, oldest first."""
+        if np is not None:
+            column = self.buf[:, index]
+            if self.count < self.size:
+                return column[:self.count]
+            return np.concatenate((column[self.pos:], column[:self.pos]))
+
+        column = self.buf[index::self.width]
+        if self.count < self.size:
+            return column[:self.count]
+        return column[self.pos:] + column[:self.pos]
+
+    def sparkline(self, index):
+        return usage_glyphs(self.ordered(index))
+
+    def summary(self):
+        """
+        Returns (mins, avgs, maxs, sparklines) for every cpu line at once,
+        so the per-core tooltip does not walk the window once per core.
+        """
+        count = self.count
+        if np is not None:
+            if count < self.size:
+                window = self.buf[:count]
+            else:
+                window = np.concatenate((self.buf[self.pos:], self.buf[:self.pos]))
+            glyphs = usage_glyphs(window.T.ravel())
+            sparks = [glyphs[i:i + count] for i in range(0, len(glyphs), count)]
+            return window.min(axis=0), window.mean(axis=0), window.max(axis=0), sparks
+
+        mins, avgs, maxs, sparks = [], [], [], []
+        for index in range(self.width):
+            u_min, u_avg, u_max = self.stats(index)
+            mins.append(u_min)
+            avgs.append(u_avg)
+            maxs.append(u_max)
+            sparks.append(self.sparkline(index))
+        return mins, avgs, maxs, sparks
+
+    def stats(self, index):
+        """Returns (min, avg, max) over the window."""
+        window = self.ordered(index)
+        if not len(window):
+            return 0.0, 0.0, 0.0
+        return min(window), sum(window) / len(window), max(window)
+
+
+def format_heatmap(names, usage, throttled):
+    """
+    Renders per-core usage as rows of HEATMAP_ROW block glyphs,
+    one glyph per core, marking rows that contain throttled cores.
+    """
+    glyphs = usage_glyphs(usage)
+    lines = []
+    for start in range(0, len(names), HEATMAP_ROW):
+        row_names = names[start:start + HEATMAP_ROW]
+        label = f"{row_names[0]:>3}-{row_names[-1]:<3}"
+        flag = " !" if throttled and any(name in throttled for name in row_names) else ""
+        lines.append(f"{label} {glyphs[start:start + HEATMAP_ROW]}{flag}")
+    return "\n".join(lines)
+
+
+class ProcessScanner:
+    """
+    Incremental scanner of /proc/[pid]/stat for the top CPU consumers.
+    Keeps a pid table between scans: comm is only decoded for new pids,
+    known pids only update utime+stime, and pids that vanished are dropped.
+    A pid reused by a new process is told apart by its start time.
+    """
+
+    PROC = '/proc'
+
+    def __init__(self, interval=TOP_PROCESSES_INTERVAL):
+        self.interval = interval
+        self.ticks_per_sec = os.sysconf('SC_CLK_TCK')
+        # pid -> [comm, start_time, total_ticks, delta_ticks]
+        self.table = {}
+        self.last_scan = None
+        self.elapsed = 0
+        self.top_cache = []
+        self.scan()
+
+    def read_stat(self, pid):
+        fd = os.open(f'{self.PROC}/{pid}/stat', os.O_RDONLY)
+        try:
+            return os.read(fd, 1024)
+        finally:
+            os.close(fd)
+
+    def scan(self):
+        now = time.monotonic()
+        table = self.table
+        seen = set()
+        for entry in os.listdir(self.PROC):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
             try:
-                idle = float(idle_str)
-                usage = 100.0 - idle
-                formatted_usage[cpu_name] = usage
-            except ValueError:
+                data = self.read_stat(pid)
+            except OSError:
                 continue
-                
-        return formatted_usage
 
-    except Exception as e:
-        return {}
+            # comm can contain spaces and parens, so split after the last ')'
+            end = data.rfind(b')')
+            fields = data[end + 2:].split(b' ', 20)
+            ticks = int(fields[11]) + int(fields[12])
+            start_time = fields[19]
+            seen.add(pid)
+
+            info = table.get(pid)
+            if info is None or info[1] != start_time:
+                # New process, or a new one under a reused pid
+                comm = data[data.find(b'(') + 1:end].decode(errors='replace')
+                table[pid] = [comm, start_time, ticks, 0]
+            else:
+                info[3] = ticks - info[2]
+                info[2] = ticks
+
+        for pid in table.keys() - seen:
+            del table[pid]
+
+        elapsed = now - self.last_scan if self.last_scan else 0
+        self.last_scan = now
+        return elapsed
+
+    def top(self, count):
+        """
+        Returns [(pid, comm, percent), ...] for the busiest processes over the
+        last scan interval, rescanning only once the interval has passed.
+        """
+        if time.monotonic() - self.last_scan < self.interval:
+            return self.top_cache
+        elapsed = self.elapsed = self.scan()
+        busiest = heapq.nlargest(count, self.table.items(), key=lambda item: item[1][3])
+        scale = 100.0 / (self.ticks_per_sec * elapsed)
+        self.top_cache = [(pid, info[0], info[3] * scale) for pid, info in busiest if info[3] > 0]
+        return self.top_cache
+
+
+class AdaptiveInterval:
+    """
+    Picks the sleep before the next sample: grows by a second per idle and
+    stable tick up to MAX_INTERVAL, drops back to MIN_INTERVAL when busy.
+    """
+
+    def __init__(self):
+        self.interval = MIN_INTERVAL
+        self.last_usage = None
+
+    def update(self, usage, temp):
+        stable = self.last_usage is not None and abs(usage - self.last_usage) <= STABLE_DELTA
+        self.last_usage = usage
+
+        if not ADAPTIVE_INTERVAL or usage >= BUSY_USAGE or (temp is not None and temp >= BUSY_TEMP):
+            self.interval = MIN_INTERVAL
+        elif usage < IDLE_USAGE and stable:
+            self.interval = min(MAX_INTERVAL, self.interval + 1.0)
+        else:
+            self.interval = MIN_INTERVAL
+        return self.interval
+
+
+class CpuFreqReader:
+    """
+    Reads per-core scaling_cur_freq and thermal_throttle counters.
+    Paths are resolved and opened once; each tick is a single pass of
+    preads over the already open descriptors.
+    """
+
+    CPU_DIR = '/sys/devices/system/cpu'
+    THROTTLE_COUNTERS = [
+        ('thermal', 'core_throttle_count'),
+        ('thermal', 'package_throttle_count'),
+        ('power', 'core_power_limit_count'),
+        ('power', 'package_power_limit_count'),
+    ]
+
+    def __init__(self):
+        # [(core, fd)] for frequencies, [(core, kind, fd)] for throttle counters
+        self.freq_fds = []
+        self.throttle_fds = []
+        self.last_counts = {}
+        for path in glob.glob(f'{self.CPU_DIR}/cpu[0-9]*'):
+            core = os.path.basename(path)[3:]
+            fd = self.open(f'{path}/cpufreq/scaling_cur_freq')
+            if fd is not None:
+                self.freq_fds.append((core, fd))
+            for kind, name in self.THROTTLE_COUNTERS:
+                fd = self.open(f'{path}/thermal_throttle/{name}')
+                if fd is not None:
+                    self.throttle_fds.append((core, kind, fd))
+        self.read()
+
+    @staticmethod
+    def open(path):
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def read(self):
+        """
+        Returns ({core: MHz}, {core: set of throttle kinds}) where the second
+        dict only lists cores whose counters went up since the last read.
+        """
+        freqs = {}
+        for core, fd in self.freq_fds:
+            try:
+                freqs[core] = int(os.pread(fd, 32, 0)) / 1000
+            except (OSError, ValueError):
+                continue
+
+        throttled = {}
+        last = self.last_counts
+        for core, kind, fd in self.throttle_fds:
+            try:
+                count = int(os.pread(fd, 32, 0))
+            except (OSError, ValueError):
+                continue
+            key = (core, fd)
+            if key in last and count > last[key]:
+                throttled.setdefault(core, set()).add(kind)
+            last[key] = count
+        return freqs, throttled
+
+
+class PressureReader:
+    """
+    Reads avg10 stall values from /proc/pressure/{cpu,memory,io}.
+    The files are opened once and re-read with pread on every tick.
+    """
+
+    RESOURCES = ['cpu', 'memory', 'io']
+
+    def __init__(self):
+        self.fds = []
+        for resource_name in self.RESOURCES:
+            try:
+                self.fds.append((resource_name, os.open(f'/proc/pressure/{resource_name}', os.O_RDONLY)))
+            except OSError:
+                # Kernel without PSI (or psi=0 on the command line)
+                continue
+
+    def read(self):
+        """Returns {resource: (some_avg10, full_avg10)}."""
+        pressure = {}
+        for resource_name, fd in self.fds:
+            try:
+                lines = os.pread(fd, 256, 0).split(b'\n')
+                # some avg10=0.00 avg60=0.00 avg300=0.00 total=0
+                some = float(lines[0].split()[1][6:])
+                full = float(lines[1].split()[1][6:]) if len(lines) > 1 and lines[1] else 0.0
+            except (OSError, ValueError, IndexError):
+                continue
+            pressure[resource_name] = (some, full)
+        return pressure
+
 
 def main():
     # Get static info once
     model = get_cpu_model()
+    sampler = CpuSampler()
+    thermometer = HwmonTemp()
+    history = UsageHistory()
+    processes = ProcessScanner() if TOP_PROCESSES else None
+    pacer = AdaptiveInterval()
+    freq_reader = CpuFreqReader()
+    pressure_reader = PressureReader()
+    interval = MIN_INTERVAL
+    last_shown = None
+    last_tooltip = 0.0
     
     while True:
         try:
-            usage_data = get_cpu_usage_and_cores()
-            temp = get_cpu_temp()
+            time.sleep(interval)
+            usage = sampler.sample()
+            history.push(usage)
+            temp = thermometer.read()
+            freqs, throttled = freq_reader.read()
+            pressure = pressure_reader.read()
             
-            total_usage = usage_data.get('all', 0.0)
+            total_usage = float(usage[0])
+            cores = sampler.names[1:]
             
             # Format Tooltip
             tooltip = f"CPU Model: {model}\n"
             tooltip += f"Temperature: {temp}°C\n"
-            tooltip += "----------------\n"
-            
-            # Sort cores numerically
-            cores = []
-            for k in usage_data.keys():
-                if k.isdigit():
-                    cores.append(int(k))
-            cores.sort()
-            
-            for core in cores:
-                usg = usage_data.get(str(core), 0.0)
-                # Bar graph for tooltip?
-                # usg_bar = "█" * int(usg / 10) + "░" * (10 - int(usg / 10))
-                tooltip += f"Core {core:<2}: {usg:5.1f}%\n"
+            if throttled:
+                kinds = sorted(set().union(*throttled.values()))
+                cores_list = ", ".join(sorted(throttled, key=int))
+                tooltip += f"Throttling ({'/'.join(kinds)}): cores {cores_list}\n"
+            if pressure:
+                stalls = "  ".join(f"{name} {some:.1f}/{full:.1f}" for name, (some, full) in pressure.items())
+                tooltip += f"Pressure avg10 some/full %: {stalls}\n"
+
+            if len(cores) > COMPACT_CORES:
+                # Too many cores for one line each: total history plus a heatmap
+                u_min, u_avg, u_max = history.stats(0)
+                tooltip += f"Last {history.count} samples: now  min/avg/max\n"
+                tooltip += f"Total: {total_usage:5.1f}% {history.sparkline(0)} {u_min:3.0f}/{u_avg:3.0f}/{u_max:3.0f}\n"
+                if freqs:
+                    mhz = freqs.values()
+                    tooltip += f"Frequency: {min(mhz) / 1000:4.2f}-{max(mhz) / 1000:4.2f}GHz (avg {sum(mhz) / len(mhz) / 1000:4.2f}GHz)\n"
+                tooltip += "----------------\n"
+                tooltip += format_heatmap(cores, usage[1:], throttled) + "\n"
+            else:
+                tooltip += f"Last {history.count} samples per core: now  min/avg/max\n"
+                tooltip += "----------------\n"
+                mins, avgs, maxs, sparks = history.summary()
+                for index, core in enumerate(cores, start=1):
+                    usg = usage[index]
+                    u_min, u_avg, u_max = mins[index], avgs[index], maxs[index]
+                    spark = sparks[index]
+                    freq = freqs.get(core)
+                    freq_str = f" {freq / 1000:4.2f}GHz" if freq is not None else ""
+                    flag = " !" if core in throttled else ""
+                    tooltip += f"Core {core:<2}: {usg:5.1f}%{freq_str} {spark} {u_min:3.0f}/{u_avg:3.0f}/{u_max:3.0f}{flag}\n"
+
+            if processes:
+                top = processes.top(TOP_PROCESSES)
+                if top:
+                    tooltip += "----------------\n"
+                    tooltip += f"Top processes (last {processes.elapsed:.0f}s):\n"
+                    for pid, comm, pct in top:
+                        tooltip += f"{pct:5.1f}% {comm} ({pid})\n"
                 
             css_class = "normal"
             try:
@@ -168,7 +569,17 @@ def main():
                 elif t_val > 60:
                     css_class = "warning"
             except:
-                pass
+                t_val = None
+            if throttled and css_class == "normal":
+                css_class = "warning"
+
+            worst_stall = max((some for some, full in pressure.values()), default=0.0)
+            if worst_stall >= PSI_CRITICAL:
+                css_class = "critical"
+            elif worst_stall >= PSI_WARNING and css_class == "normal":
+                css_class = "warning"
+
+            interval = pacer.update(total_usage, t_val)
             
             # Remove trailing newline from tooltip
             tooltip = tooltip.strip()
@@ -185,17 +596,21 @@ def main():
                 "class": css_class
             }
             
-            print(json.dumps(output), flush=True)
-
-            # mpstat 1 1 takes about 1 second to run, so we effectively have a 1s interval.
-            # If for some reason it returns instantly, we might want a small sleep, but valid mpstat
-            # calls should block for the interval.
+            # Only wake waybar up when the bar itself changed. The tooltip
+            # moves on every sample (sparklines, per-core decimals), so on its
+            # own it is only refreshed every TOOLTIP_INTERVAL seconds.
+            shown = (output["text"], output["class"])
+            now = time.monotonic()
+            if shown != last_shown or now - last_tooltip >= TOOLTIP_INTERVAL:
+                print(json.dumps(output), flush=True)
+                last_shown = shown
+                last_tooltip = now
             
         except Exception as e:
             # Output error but keep running
             error_output = {"text": "Error", "tooltip": str(e)}
             print(json.dumps(error_output), flush=True)
-            import time
+            last_shown = None
             time.sleep(2) # Wait before retrying
 
 if __name__ == "__main__":
@@ -5,12 +5,98 @@ import time
 import sys
 import subprocess
 import os
+import errno
+import select
+import socket
+import struct
+import threading
+from array import array
+from collections import namedtuple
+
+try:
+    from jeepney import DBusAddress, MatchRule, HeaderFields, new_method_call
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    from jeepney.wrappers import unwrap_msg
+except ImportError:
+    # Without jeepney the connection state falls back to polling nmcli
+    open_dbus_connection = None
 
 # --- Configuration ---
 MENU_COMMAND = "fuzzel -d"
 TEMP_FILE = "/tmp/waybar_network_selected_interface.tmp"
+NM_BUS = "SYSTEM"  # bus NetworkManager lives on
+NMCLI_POLL_INTERVAL = 30  # seconds between nmcli polls when D-Bus is unavailable
+SMOOTHING_HALF_LIFE = 3.0  # seconds for the bar's EWMA rate to move halfway to a new level
+WIFI_SCAN_INTERVAL = 120  # seconds between background Wi-Fi scans in the monitor
+WIFI_CACHE_FILE = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "waybar-network-wifi.json")
+# Aggregate mode (also: --aggregate [all|if1,if2,...]): None follows a single
+# interface, "all" sums every non-virtual interface, or list the names to sum
+AGGREGATE_INTERFACES = None
+VIRTUAL_DESCRIPTIONS = {"VPN/Virtual", "Virtual/Bridge"}
+TOP_TALKERS = 5  # processes listed in the tooltip when the link is busy, 0 to disable
+TOP_TALKERS_THRESHOLD = 1024 * 1024  # bytes/s (smoothed, either direction) before looking for them
+TOP_TALKERS_FULL_WALK = 60  # seconds between walks of every process, for sockets the quick scan missed
+TOP_TALKERS_INTERVAL = 5  # minimum seconds between two socket scans
+TOP_TALKERS_SAMPLE = 1.0  # seconds between the two reads of TCP byte counters a scan takes its rates from
+STATUS_TIMEOUT = 60  # seconds a progress message from --select stays on the bar
+RESULT_TIMEOUT = 5  # seconds the final connect result stays on the bar
+HISTORY_SIZE = 180  # rate samples kept for the tooltip (about 3 minutes at 1 Hz)
+SPARKLINE_WIDTH = 45  # characters; each shows the peak of HISTORY_SIZE / SPARKLINE_WIDTH samples
 # ---------------------
 
+NM_NAME = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_DEVICE_TYPE_WIFI = 2
+NM_ACTIVE_STATE_ACTIVATED = 2
+NM_ACTIVE_STATE_DEACTIVATED = 4
+NM_DEVICE_STATE_FAILED = 120
+# Device state reasons that mean the stored Wi-Fi secrets were refused. The
+# ActiveConnection only says DEVICE_DISCONNECTED for Wi-Fi; its own secret
+# reasons are for VPNs.
+NM_DEVICE_REASONS_BAD_SECRETS = {7, 8, 11}  # NO_SECRETS, SUPPLICANT_DISCONNECT, SUPPLICANT_TIMEOUT
+WIFI_SCAN_TIMEOUT = 10  # seconds to wait for a targeted scan to finish
+WIFI_CONNECT_TIMEOUT = 45  # seconds to wait for an activation to succeed or fail
+
+# Monitors listen on abstract datagram sockets named CONTROL_PREFIX + pid,
+# so --select can tell every running instance that something changed.
+# Abstract sockets have no permissions: senders are checked by uid instead.
+CONTROL_PREFIX = "waybar-network."
+UCRED = struct.Struct("=iII")  # pid, uid, gid of an SCM_CREDENTIALS message
+
+# rtnetlink constants (linux/netlink.h, linux/rtnetlink.h, linux/if.h)
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_LINK = 5
+IFLA_MASTER = 10
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+SO_RCVBUFFORCE = 33  # asm-generic/socket.h; not exported by the socket module
+NETLINK_RCVBUF = 1 << 20  # bytes; room for the link storm of a container stack starting
+NLMSG_HEADER = struct.Struct("=IHHII")
+IFINFOMSG = struct.Struct("=BxHiII")
+RTATTR = struct.Struct("=HH")
+MIN_SAMPLE_INTERVAL = 0.5  # seconds; a rate over a shorter window (e.g. just after opening) is noise
+
+# sock_diag constants (linux/sock_diag.h, linux/inet_diag.h, linux/tcp.h)
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+INET_DIAG_INFO = 2
+TCP_STATES_BUT_LISTEN = 0xFFF & ~(1 << 10)
+INET_DIAG_REQ_V2 = struct.Struct("=BBBxI48x")
+INET_DIAG_MSG = struct.Struct("=BBBB48xIIIII")  # ..., expires, rqueue, wqueue, uid, inode
+TCP_INFO_BYTES_OFFSET = 120  # tcpi_bytes_acked, then tcpi_bytes_received (Linux 4.2+)
+TCP_INFO_BYTES = struct.Struct("=QQ")
+
 
 def format_speed(speed_bytes):
     """Formats speed in bytes to a ###.# B/s format, padded with leading spaces."""
@@ -23,33 +109,307 @@ def format_speed(speed_bytes):
     return speed
 
 
-def get_interface_description(interface):
-    """Gets a human-readable description for a network interface."""
+def format_bytes(count):
+    """Formats a byte count with a binary unit, e.g. '12.3 MB'."""
+    for unit in ["B", "KB", "MB", "GB"]:
+        if count < 1024:
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+
+class ThroughputHistory:
+    """
+    Fixed-size ring buffers of recent download/upload rates, plus an EWMA
+    of each for the bar text and byte totals for the whole session.
+    Memory use does not grow with uptime.
+    """
+
+    SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self.down = array("d", bytes(8 * size))
+        self.up = array("d", bytes(8 * size))
+        self.total_down = 0.0
+        self.total_up = 0.0
+        self.reset()
+
+    def reset(self):
+        """Forgets the rate history (e.g. when switching interface); totals are kept."""
+        self.pos = 0
+        self.count = 0
+        self.smooth_down = None
+        self.smooth_up = None
+
+    def push(self, down, up, elapsed):
+        self.down[self.pos] = down
+        self.up[self.pos] = up
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.total_down += down * elapsed
+        self.total_up += up * elapsed
+
+        if self.smooth_down is None:
+            self.smooth_down, self.smooth_up = down, up
+        else:
+            alpha = 1.0 - 0.5 ** (elapsed / SMOOTHING_HALF_LIFE)
+            self.smooth_down += alpha * (down - self.smooth_down)
+            self.smooth_up += alpha * (up - self.smooth_up)
+
+    def ordered(self, buf):
+        if self.count < self.size:
+            return buf[:self.count]
+        return buf[self.pos:] + buf[:self.pos]
+
+    def stats(self, buf):
+        """Returns (peak, average) over the window."""
+        window = self.ordered(buf)
+        if not window:
+            return 0.0, 0.0
+        return max(window), sum(window) / len(window)
+
+    def sparkline(self, buf):
+        window = self.ordered(buf)
+        peak = max(window, default=0.0)
+        if peak <= 0:
+            return ""
+        bucket = max(1, self.size // SPARKLINE_WIDTH)
+        top = len(self.SPARK_CHARS) - 1
+        chars = []
+        for start in range(0, len(window), bucket):
+            level = max(window[start:start + bucket]) / peak
+            chars.append(self.SPARK_CHARS[int(level * top + 0.5)])
+        return "".join(chars)
+
+
+class TopTalkers:
+    """
+    Attributes open network sockets to processes, for the tooltip of a
+    busy link. Sockets come from /proc/net/{tcp,tcp6,udp,udp6} and are
+    mapped to pids through the socket:[inode] links in /proc/[pid]/fd.
+
+    Processes are ranked by TCP throughput: sock_diag's per-socket
+    tcpi_bytes_acked + tcpi_bytes_received, read twice TOP_TALKERS_SAMPLE
+    apart and keyed by inode. Bytes queued on their sockets, then how many
+    sockets they hold, break ties (UDP has no byte counts). Scans run in a
+    background thread at most every TOP_TALKERS_INTERVAL seconds and the
+    inode -> pid map is kept between scans: only inodes that are new get
+    looked up, and only in pids that are new or whose fd count changed.
+    Sockets that can't be attributed (other users' daemons) are remembered
+    as unresolved until they close, so they don't force a walk of every
+    process on every scan; every TOP_TALKERS_FULL_WALK seconds all
+    processes are walked once to catch anything the quick scan missed.
+    """
+
+    PROC = "/proc"
+    NET_FILES = ["tcp", "tcp6", "udp", "udp6"]
+    TCP_LISTEN = "0A"
+
+    def __init__(self):
+        self.inode_pids = {}
+        self.known_pids = set()
+        # pid -> open fd count when last walked (st_size of /proc/[pid]/fd, 0 on kernels before 6.2)
+        self.fd_counts = {}
+        self.unresolved = set()
+        self.last_full_walk = 0.0
+        self.comms = {}
+        self.result = []
+        self.last_run = 0.0
+        self.thread = None
+
+    def request(self):
+        """Starts a scan in the background unless one is running or ran recently."""
+        if self.thread and self.thread.is_alive():
+            return
+        if time.monotonic() - self.last_run < TOP_TALKERS_INTERVAL:
+            return
+        self.last_run = time.monotonic()
+        self.thread = threading.Thread(target=self.refresh, daemon=True)
+        self.thread.start()
+
+    def read_sockets(self):
+        """Returns {inode: queued bytes} for connected/bound sockets."""
+        sockets = {}
+        for name in self.NET_FILES:
+            try:
+                with open(f"{self.PROC}/net/{name}", "r") as f:
+                    next(f)
+                    for line in f:
+                        fields = line.split()
+                        inode = fields[9]
+                        if inode == "0" or fields[3] == self.TCP_LISTEN:
+                            continue
+                        tx_queue, rx_queue = fields[4].split(":")
+                        sockets[inode] = int(tx_queue, 16) + int(rx_queue, 16)
+            except (OSError, StopIteration, IndexError, ValueError):
+                continue
+        return sockets
+
+    def read_tcp_bytes(self):
+        """Returns {inode: bytes acked + received} for TCP sockets, {} if sock_diag is unavailable."""
+        counts = {}
+        try:
+            with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG) as sock:
+                for seq, family in enumerate((socket.AF_INET, socket.AF_INET6), start=1):
+                    request = INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1),
+                                                    TCP_STATES_BUT_LISTEN)
+                    header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(request), SOCK_DIAG_BY_FAMILY,
+                                               NLM_F_REQUEST | NLM_F_DUMP, seq, 0)
+                    sock.send(header + request)
+                    while self.read_diag(sock.recv(65536), counts):
+                        pass
+        except OSError:
+            return {}
+        return counts
+
+    def read_diag(self, data, counts):
+        """Adds the byte counts of one batch of inet_diag messages to counts; returns False at the end of the dump."""
+        offset = 0
+        while offset + NLMSG_HEADER.size <= len(data):
+            length, msg_type, flags, seq, pid = NLMSG_HEADER.unpack_from(data, offset)
+            if length < NLMSG_HEADER.size or msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                return False
+            payload = data[offset + NLMSG_HEADER.size:offset + length]
+            offset += (length + 3) & ~3
+            if msg_type != SOCK_DIAG_BY_FAMILY or len(payload) < INET_DIAG_MSG.size:
+                continue
+            inode = INET_DIAG_MSG.unpack_from(payload)[-1]
+            pos = INET_DIAG_MSG.size
+            while pos + RTATTR.size <= len(payload):
+                attr_len, attr_type = RTATTR.unpack_from(payload, pos)
+                if attr_len < RTATTR.size:
+                    break
+                if attr_type == INET_DIAG_INFO and attr_len >= RTATTR.size + TCP_INFO_BYTES_OFFSET + TCP_INFO_BYTES.size:
+                    acked, received = TCP_INFO_BYTES.unpack_from(payload, pos + RTATTR.size + TCP_INFO_BYTES_OFFSET)
+                    counts[str(inode)] = acked + received
+                pos += (attr_len + 3) & ~3
+        return True
+
+    def fd_count(self, pid):
+        try:
+            return os.stat(f"{self.PROC}/{pid}/fd").st_size
+        except OSError:
+            return -1
+
+    def scan_fds(self, pid, wanted):
+        """Maps the wanted socket inodes held by pid, returns how many were found."""
+        found = 0
+        fd_dir = f"{self.PROC}/{pid}/fd"
+        self.fd_counts[pid] = self.fd_count(pid)
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            # Gone, or not ours to look at
+            return 0
+        for fd in fds:
+            try:
+                target = os.readlink(f"{fd_dir}/{fd}")
+            except OSError:
+                continue
+            if target.startswith("socket:["):
+                inode = target[8:-1]
+                if inode in wanted:
+                    self.inode_pids[inode] = pid
+                    wanted.discard(inode)
+                    found += 1
+        return found
+
+    def refresh(self):
+        bytes_before = self.read_tcp_bytes()
+        started = time.monotonic()
+        sockets = self.read_sockets()
+        pids = {entry for entry in os.listdir(self.PROC) if entry.isdigit()}
+
+        # Drop closed sockets and dead processes
+        for inode, pid in list(self.inode_pids.items()):
+            if inode not in sockets or pid not in pids:
+                del self.inode_pids[inode]
+        for pid in self.known_pids - pids:
+            self.comms.pop(pid, None)
+
+        self.unresolved &= sockets.keys()
+        unknown = set(sockets) - self.inode_pids.keys() - self.unresolved
+        full_walk = time.monotonic() - self.last_full_walk >= TOP_TALKERS_FULL_WALK
+        if full_walk:
+            # Now and then retry the unresolved too: an fd count can stay equal across a close and an open
+            unknown |= self.unresolved
+            self.unresolved = set()
+        if unknown:
+            # New sockets belong to new processes or ones whose fd set changed; only those are walked
+            for pid in sorted(pids):
+                if not unknown:
+                    break
+                count = self.fd_count(pid)
+                if full_walk or count != self.fd_counts.get(pid) or count == 0:
+                    self.scan_fds(pid, unknown)
+            # Whatever is left belongs to processes we can't look into
+            self.unresolved |= unknown
+        if full_walk:
+            self.last_full_walk = time.monotonic()
+        for pid in set(self.fd_counts) - pids:
+            del self.fd_counts[pid]
+        self.known_pids = pids
+
+        # The walk above is part of the sampling window
+        time.sleep(max(0.0, TOP_TALKERS_SAMPLE - (time.monotonic() - started)))
+        bytes_after = self.read_tcp_bytes()
+        elapsed = max(time.monotonic() - started, 1e-3)
+
+        totals = {}
+        for inode, pid in self.inode_pids.items():
+            rate, queued, conns = totals.get(pid, (0.0, 0, 0))
+            if inode in bytes_after:
+                # A socket missing from the first read was opened since
+                rate += (bytes_after[inode] - bytes_before.get(inode, 0)) / elapsed
+            totals[pid] = (rate, queued + sockets[inode], conns + 1)
+
+        result = []
+        for pid, (rate, queued, conns) in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:TOP_TALKERS]:
+            comm = self.comms.get(pid)
+            if comm is None:
+                try:
+                    with open(f"{self.PROC}/{pid}/comm", "r") as f:
+                        comm = self.comms[pid] = f.read().strip()
+                except OSError:
+                    continue
+            result.append((pid, comm, rate, conns, queued))
+        self.result = result
+
+
+def describe_interface(interface):
+    """Returns (wireless, bus, description) for a network interface, from sysfs."""
     sys_path = f"/sys/class/net/{interface}"
     
     # Check if it's a Wi-Fi device (most reliable check)
     if os.path.exists(f"{sys_path}/wireless"):
-        return "Wi-Fi"
+        return True, None, "Wi-Fi"
         
     # Check the device's underlying bus (PCI, USB, etc.)
     try:
         device_path = os.path.realpath(f"{sys_path}/device")
         if "/pci" in device_path:
-            return "Wired Ethernet"
+            return False, "pci", "Wired Ethernet"
         if "/usb" in device_path:
             # This covers USB tethering, USB Wi-Fi/Ethernet adapters
-            return "USB Connection"
+            return False, "usb", "USB Connection"
     except FileNotFoundError:
         # Virtual devices (like VPNs, bridges) don't have a 'device' link
         pass
         
     # Fallback for virtual devices or other types
     if interface.startswith("tun") or interface.startswith("tap"):
-        return "VPN/Virtual"
-    if interface.startswith("veth") or interface.startswith("br"):
-        return "Virtual/Bridge"
+        return False, None, "VPN/Virtual"
+    if interface.startswith("veth") or interface.startswith("br") or os.path.isdir(f"{sys_path}/bridge"):
+        return False, None, "Virtual/Bridge"
         
-    return "Unknown"
+    return False, None, "Unknown"
+
+
+def get_interface_description(interface):
+    """Gets a human-readable description for a network interface."""
+    return describe_interface(interface)[2]
 
 
 def get_network_interfaces():
@@ -108,6 +468,7 @@ def select_interface():
 
             with open(TEMP_FILE, "w") as f:
                 f.write(selected_iface)
+            notify_monitors("select")
 
 def disconnect_other_interfaces(keep_interface):
     """Disconnects all other network interfaces to ensure traffic routing."""
@@ -156,27 +517,125 @@ def get_wifi_networks(interface):
     except Exception:
         return []
 
-def select_wifi_network(interface):
-    """Shows a menu of Wi-Fi networks and returns the selected SSID."""
+def read_wifi_cache(interface):
+    """Returns (scan timestamp, networks) for the interface from WIFI_CACHE_FILE, or (0, None)."""
+    try:
+        with open(WIFI_CACHE_FILE, "r") as f:
+            entry = json.load(f).get(interface)
+        return entry["time"], [tuple(network) for network in entry["networks"]]
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return 0, None
+
+
+def scan_wifi_into_cache(interface):
+    """Scans for Wi-Fi networks and stores the result in WIFI_CACHE_FILE."""
     networks = get_wifi_networks(interface)
     if not networks:
-        return None
-        
-    menu_entries = []
-    for ssid, bars, security in networks:
-        # Format: "SSID             ▂▄▆█ WPA2"
-        menu_entries.append(f"{ssid:<25} {bars} {security}")
+        return
+    try:
+        with open(WIFI_CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache[interface] = {"time": time.time(), "networks": networks}
+    # Write to a temporary file and rename, so readers never see half a file
+    tmp_file = f"{WIFI_CACHE_FILE}.{os.getpid()}"
+    with open(tmp_file, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, WIFI_CACHE_FILE)
+
+
+class WifiScanCache:
+    """
+    Refreshes WIFI_CACHE_FILE from a background thread of the monitor:
+    every WIFI_SCAN_INTERVAL seconds, and right away when request()ed
+    (interface change, or a --select asking for fresh results).
+    """
+
+    def __init__(self, interfaces):
+        self.interfaces = interfaces
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def request(self):
+        self.wake.set()
+
+    def run(self):
+        requested = True
+        while True:
+            for interface in list(self.interfaces.links):
+                if not self.interfaces.metadata(interface).wireless:
+                    continue
+                # Other monitors (one per bar) share the cache; skip if one just scanned
+                scanned_at, _ = read_wifi_cache(interface)
+                age = time.time() - scanned_at
+                if age < (5 if requested else WIFI_SCAN_INTERVAL / 2):
+                    continue
+                scan_wifi_into_cache(interface)
+            requested = self.wake.wait(WIFI_SCAN_INTERVAL)
+            self.wake.clear()
+
+
+def select_wifi_network(interface):
+    """
+    Shows a menu of Wi-Fi networks and returns the selected SSID.
+    The menu opens with the monitor's cached scan results and is reopened
+    with the new list if a fresh scan lands while it is still showing.
+    """
+    scanned_at, networks = read_wifi_cache(interface)
+
+    # Ask the monitors for a fresh scan; do it ourselves if none is running
+    if not notify_monitors("scan"):
+        threading.Thread(target=scan_wifi_into_cache, args=(interface,), daemon=True).start()
+
+    if not networks:
+        # Nothing cached yet: wait for the scan like before
+        deadline = time.monotonic() + 15
+        while not networks and time.monotonic() < deadline:
+            time.sleep(0.2)
+            scanned_at, networks = read_wifi_cache(interface)
+        if not networks:
+            return None
         
-    menu_input = "\n".join(menu_entries).encode('utf-8')
-    
     try:
-        process = subprocess.run(
-            MENU_COMMAND.split(),
-            input=menu_input,
-            capture_output=True,
-            check=True
-        )
-        selected_entry = process.stdout.decode('utf-8').strip()
+        while True:
+            menu_entries = []
+            for ssid, bars, security in networks:
+                # Format: "SSID             ▂▄▆█ WPA2"
+                menu_entries.append(f"{ssid:<25} {bars} {security}")
+
+            menu_input = "\n".join(menu_entries).encode('utf-8')
+            process = subprocess.Popen(
+                MENU_COMMAND.split(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            process.stdin.write(menu_input)
+            process.stdin.close()
+
+            refreshed = False
+            while process.poll() is None:
+                time.sleep(0.2)
+                if scanned_at is None:
+                    continue
+                fresh_at, fresh_networks = read_wifi_cache(interface)
+                if fresh_at > scanned_at:
+                    # Only refresh once, the user is probably about to pick something
+                    scanned_at = None
+                    if fresh_networks and fresh_networks != networks:
+                        networks = fresh_networks
+                        process.terminate()
+                        process.wait()
+                        refreshed = True
+                        break
+            if not refreshed:
+                break
+
+        if process.returncode != 0:
+            return None
+        selected_entry = process.stdout.read().decode('utf-8').strip()
         if selected_entry:
             # Extract SSID (everything before the signal bars)
             # Find the signal bars by splitting? 
@@ -204,7 +663,7 @@ def select_wifi_network(interface):
             # Simple fallback: split by multiple spaces?
             return selected_entry.split("  ")[0].strip()
             
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except (OSError, subprocess.SubprocessError):
         return None
     return None
 
@@ -230,8 +689,201 @@ def prompt_for_password(ssid):
     except Exception:
         return None
 
+class WifiConnector:
+    """
+    Connects to a Wi-Fi network through NetworkManager's D-Bus API.
+    Waits on signals instead of sleeping: a scan targeted at the SSID
+    ends when the device's LastScan changes, an activation when the
+    device reaches activated or failed. A saved profile is reused, and
+    only its PSK is updated when a new password is needed. Progress goes
+    to the running monitors so the bar shows what is happening.
+    """
+
+    def __init__(self, conn, interface, ssid):
+        self.conn = conn
+        self.interface = interface
+        self.ssid = ssid
+        self.ssid_bytes = ssid.encode()
+        self.device = nm_call(conn, NM_PATH, NM_NAME, "GetDeviceByIpIface", "s", (interface,))[0]
+
+    def progress(self, text):
+        notify_monitors(f"status {text}")
+
+    def wait_for_signal(self, signals, done, timeout):
+        """Waits until done(msg) is not None for a signal in the filter queue, or timeout; returns that result."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                msg = self.conn.recv_until_filtered(signals, timeout=remaining)
+            except TimeoutError:
+                return None
+            result = done(msg)
+            if result is not None:
+                return result
+
+    def find_profile(self):
+        """Returns the path of a saved connection profile for the SSID, or None."""
+        settings_path = f"{NM_PATH}/Settings"
+        for path in nm_call(self.conn, settings_path, f"{NM_NAME}.Settings", "ListConnections")[0]:
+            try:
+                settings = nm_call(self.conn, path, f"{NM_NAME}.Settings.Connection", "GetSettings")[0]
+            except Exception:
+                continue
+            wireless = settings.get("802-11-wireless", {})
+            if bytes(wireless.get("ssid", ("ay", b""))[1]) == self.ssid_bytes:
+                return path
+        return None
+
+    def find_access_point(self):
+        for ap in nm_call(self.conn, self.device, f"{NM_NAME}.Device.Wireless", "GetAllAccessPoints")[0]:
+            try:
+                if bytes(nm_get(self.conn, ap, f"{NM_NAME}.AccessPoint", "Ssid")) == self.ssid_bytes:
+                    return ap
+            except Exception:
+                continue
+        return None
+
+    def scan_for_access_point(self):
+        """Returns the access point for the SSID, scanning for it if it is not known yet."""
+        ap = self.find_access_point()
+        if ap:
+            return ap
+        self.progress(f"Scanning for {self.ssid}…")
+        rule = MatchRule(type="signal", interface="org.freedesktop.DBus.Properties",
+                         member="PropertiesChanged", path=self.device)
+
+        def scan_done(msg):
+            changed = msg.body[1] if len(msg.body) == 3 else {}
+            return True if "LastScan" in changed else None
+
+        with self.conn.filter(rule) as signals:
+            # Subscribe before asking, so a fast scan can't finish unseen
+            self.conn.send_and_get_reply(message_bus.AddMatch(rule))
+            try:
+                nm_call(self.conn, self.device, f"{NM_NAME}.Device.Wireless", "RequestScan", "a{sv}",
+                        ({"ssids": ("aay", [self.ssid_bytes])},))
+            except Exception:
+                # Scanning too often is refused; whatever NM already knows will have to do
+                pass
+            else:
+                self.wait_for_signal(signals, scan_done, WIFI_SCAN_TIMEOUT)
+        return self.find_access_point()
+
+    def activate(self, activate_call):
+        """
+        Runs activate_call(), which returns the new ActiveConnection's path, and
+        waits for that activation to finish; returns True on success. The device
+        state reason of a failure is left in self.failure_reason.
+        """
+        # Watch the ActiveConnection to tell success from failure: when switching
+        # networks the device passes through DEACTIVATING and DISCONNECTED on the
+        # way up. The device's FAILED transition carries the reason, though.
+        active_rule = MatchRule(type="signal", interface=f"{NM_NAME}.Connection.Active", member="StateChanged",
+                                path_namespace=f"{NM_PATH}/ActiveConnection")
+        device_rule = MatchRule(type="signal", interface=f"{NM_NAME}.Device", member="StateChanged",
+                                path=self.device)
+        self.failure_reason = None
+
+        with self.conn.filter(MatchRule(type="signal", member="StateChanged")) as signals:
+            # Subscribe before asking, so a fast activation can't finish unseen
+            self.conn.send_and_get_reply(message_bus.AddMatch(active_rule))
+            self.conn.send_and_get_reply(message_bus.AddMatch(device_rule))
+            self.progress(f"Connecting to {self.ssid}…")
+            try:
+                active = activate_call()
+            except Exception:
+                return False
+
+            def settled(msg):
+                path = msg.header.fields.get(HeaderFields.path)
+                if path == self.device:
+                    new_state, old_state, reason = msg.body
+                    if new_state == NM_DEVICE_STATE_FAILED:
+                        self.failure_reason = reason
+                    return None
+                if path != active:
+                    return None  # e.g. the connection being replaced going down
+                state, reason = msg.body
+                if state == NM_ACTIVE_STATE_ACTIVATED:
+                    return True
+                if state == NM_ACTIVE_STATE_DEACTIVATED:
+                    if self.failure_reason is None:
+                        # Missed the FAILED signal: the device may still say why
+                        try:
+                            self.failure_reason = nm_get(self.conn, self.device, f"{NM_NAME}.Device", "StateReason")[1]
+                        except Exception:
+                            pass
+                    return False
+                return None
+
+            try:
+                # It may have come up before we got the reply
+                if nm_get(self.conn, active, f"{NM_NAME}.Connection.Active", "State") == NM_ACTIVE_STATE_ACTIVATED:
+                    return True
+            except Exception:
+                pass
+            return bool(self.wait_for_signal(signals, settled, WIFI_CONNECT_TIMEOUT))
+
+    def connect(self):
+        settings_iface = f"{NM_NAME}.Settings.Connection"
+        profile = self.find_profile()
+        if profile:
+            def activate_profile():
+                return nm_call(self.conn, NM_PATH, NM_NAME, "ActivateConnection", "ooo",
+                               (profile, self.device, "/"))[0]
+
+            # Saved profile: try it as it is first
+            if self.activate(activate_profile):
+                return True
+            settings = nm_call(self.conn, profile, settings_iface, "GetSettings")[0]
+            security = settings.get("802-11-wireless-security")
+            # Only ask again for a password if the profile has one and it was refused;
+            # an open network or a timeout has nothing a new PSK would fix
+            if not security or self.failure_reason not in NM_DEVICE_REASONS_BAD_SECRETS:
+                return False
+            password = prompt_for_password(self.ssid)
+            if not password:
+                return False
+            security.setdefault("key-mgmt", ("s", "wpa-psk"))
+            security["psk"] = ("s", password)
+            nm_call(self.conn, profile, settings_iface, "Update", "a{sa{sv}}", (settings,))
+            return self.activate(activate_profile)
+
+        ap = self.scan_for_access_point()
+        if not ap:
+            return False
+        flags = [nm_get(self.conn, ap, f"{NM_NAME}.AccessPoint", prop) for prop in ("Flags", "WpaFlags", "RsnFlags")]
+        settings = {}
+        if any(flags):
+            password = prompt_for_password(self.ssid)
+            if not password:
+                return False
+            settings["802-11-wireless-security"] = {"key-mgmt": ("s", "wpa-psk"), "psk": ("s", password)}
+        return self.activate(lambda: nm_call(self.conn, NM_PATH, NM_NAME, "AddAndActivateConnection", "a{sa{sv}}oo",
+                                             (settings, self.device, ap))[1])
+
+
 def connect_to_wifi(interface, ssid):
     """Attempts to connect to a Wi-Fi network, prompting for password if needed."""
+    if open_dbus_connection is not None:
+        try:
+            conn = open_dbus_connection(bus=NM_BUS)
+        except Exception:
+            conn = None
+        if conn is not None:
+            try:
+                connected = WifiConnector(conn, interface, ssid).connect()
+            except Exception:
+                connected = False
+            finally:
+                conn.close()
+            notify_monitors(f"result {'Connected to' if connected else 'Could not connect to'} {ssid}")
+            return connected
+
+    # No D-Bus: go through nmcli
     # First try connecting without password (saved profile or open network)
     try:
         subprocess.run(
@@ -246,23 +898,27 @@ def connect_to_wifi(interface, ssid):
         password = prompt_for_password(ssid)
         if password:
             try:
-                # Delete existing connection profile to ensure clean slate
-                subprocess.run(
-                    ["nmcli", "connection", "delete", ssid],
-                    check=False,
+                # Reuse the saved profile if there is one, with the new password
+                updated = subprocess.run(
+                    ["nmcli", "connection", "modify", ssid, "wifi-sec.key-mgmt", "wpa-psk", "wifi-sec.psk", password],
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
-                )
+                ).returncode == 0
+                if updated:
+                    subprocess.run(
+                        ["nmcli", "connection", "up", ssid, "ifname", interface],
+                        capture_output=True,
+                        check=True
+                    )
+                    return True
 
-                # Rescan before retry
+                # --rescan yes waits for the scan to finish instead of a fixed sleep
                 subprocess.run(
-                    ["nmcli", "device", "wifi", "rescan", "ifname", interface],
+                    ["nmcli", "device", "wifi", "list", "ifname", interface, "--rescan", "yes"],
                     check=False,
                     stdout=subprocess.DEVNULL,
                     stderr=subprocess.DEVNULL
                 )
-                time.sleep(2) # Give it a moment to populate
-
                 subprocess.run(
                     ["nmcli", "device", "wifi", "connect", ssid, "password", password, "ifname", interface],
                     capture_output=True,
@@ -274,37 +930,296 @@ def connect_to_wifi(interface, ssid):
     return False
 
 
-def find_best_interface():
+def find_best_interface(links):
     """Finds the primary active network interface (the fallback method)."""
-    stats = psutil.net_if_stats()
     for prefix in ["en", "eth", "wl", "wlan"]:
-        for name, data in stats.items():
-            if name.startswith(prefix) and data.isup:
+        for name, isup in links.items():
+            if name.startswith(prefix) and isup:
                 return name
-    for name, data in stats.items():
-        if data.isup and name != "lo":
+    for name, isup in links.items():
+        if isup and name != "lo":
             return name
     return None
 
 
-def get_target_interface():
-    """Determines which interface to monitor, prioritizing user's choice."""
-    if os.path.exists(TEMP_FILE):
+def get_selected_interface():
+    """Returns the interface chosen with --select, if any."""
+    try:
         with open(TEMP_FILE, "r") as f:
-            interface = f.read().strip()
-        stats = psutil.net_if_stats()
-        if interface in stats and stats[interface].isup:
-            return interface
-        else:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def get_target_interface(links, selected):
+    """Determines which interface to monitor, prioritizing user's choice."""
+    if selected:
+        if links.get(selected):
+            return selected
+        try:
             os.remove(TEMP_FILE)
-    return find_best_interface()
+        except FileNotFoundError:
+            pass
+    return find_best_interface(links)
+
+
+def notify_monitors(message):
+    """Sends a message to every running monitor's control socket, returns how many got it."""
+    try:
+        with open("/proc/net/unix", "r") as f:
+            names = [line.split()[-1][1:] for line in f if f" @{CONTROL_PREFIX}" in line]
+    except OSError:
+        return 0
+    sent = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+        for name in names:
+            try:
+                sock.sendto(message.encode(), "\0" + name)
+                sent += 1
+            except OSError:
+                pass
+    return sent
+
+
+# Static facts about an interface, valid for as long as its ifindex exists
+InterfaceInfo = namedtuple("InterfaceInfo", ["ifindex", "mac", "wireless", "bus", "description"])
+
+
+class InterfaceTable:
+    """
+    In-memory table of interfaces and their up state, kept current by an
+    rtnetlink socket subscribed to link and IPv4 address changes.
+    wait() doubles as the monitor's sleep: it returns as soon as a link
+    changes or a control message arrives.
+    """
+
+    def __init__(self):
+        # name -> isup, in ifindex order like the kernel lists them
+        self.links = {}
+        # Bumped on every link message, so users can tell when to re-check
+        self.generation = 0
+        self.index_of = {}
+        self.macs = {}
+        # ifindex -> ifindex of its master (bond, team, bridge) / of the device it sits on (VLAN, macvlan)
+        self.masters = {}
+        self.lower = {}
+        # ifindex -> InterfaceInfo, filled on first use and dropped with the link
+        self.info = {}
+        self.indexes = {}
+        self.messages = []
+        # Sequence number of the latest RTM_GETLINK dump, and whether messages were lost meanwhile
+        self.dump_seq = 0
+        self.dumping = False
+        self.overrun = False
+
+        self.control = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.control.bind(f"\0{CONTROL_PREFIX}{os.getpid()}")
+        self.control.setsockopt(socket.SOL_SOCKET, socket.SO_PASSCRED, 1)
+
+        self.netlink = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        try:
+            # Going past net.core.rmem_max needs CAP_NET_ADMIN; otherwise take what we may
+            self.netlink.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, NETLINK_RCVBUF)
+        except OSError:
+            self.netlink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, NETLINK_RCVBUF)
+        self.netlink.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+        self.dump()
+
+    def dump(self):
+        """(Re)builds the tables from a full RTM_GETLINK dump."""
+        self.dumping = True
+        try:
+            while True:
+                self.overrun = False
+                for table in (self.links, self.index_of, self.macs, self.masters, self.lower, self.info, self.indexes):
+                    table.clear()
+                self.generation += 1
+                self.dump_seq += 1
+                request = IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+                header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(request), RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP, self.dump_seq, 0)
+                self.netlink.send(header + request)
+                while not self.read_netlink():
+                    pass
+                # Events dropped while dumping may predate or follow what we saw: go again
+                if not self.overrun:
+                    return
+        finally:
+            self.dumping = False
+
+    def read_netlink(self):
+        """Applies one batch of netlink messages, returns True at the end of a dump."""
+        try:
+            data = self.netlink.recv(65536)
+        except OSError as e:
+            if e.errno != errno.ENOBUFS:
+                raise
+            # The socket buffer overflowed and link events were dropped, so
+            # the table is stale until rebuilt from a fresh dump
+            self.overrun = True
+            if not self.dumping:
+                self.dump()
+                return True
+            return False
+        offset = 0
+        done = False
+        while offset + NLMSG_HEADER.size <= len(data):
+            length, msg_type, flags, seq, pid = NLMSG_HEADER.unpack_from(data, offset)
+            if length < NLMSG_HEADER.size:
+                break
+            if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                # Only the reply to the current dump counts; a stale one is left over from before a resync
+                done = done or seq == self.dump_seq
+            elif msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                self.apply_link(msg_type, data[offset + NLMSG_HEADER.size:offset + length])
+            offset += (length + 3) & ~3
+        return done
+
+    def apply_link(self, msg_type, payload):
+        family, if_type, index, if_flags, change = IFINFOMSG.unpack_from(payload)
+        self.generation += 1
+        name = None
+        mac = None
+        master = None
+        lower = None
+        pos = IFINFOMSG.size
+        while pos + RTATTR.size <= len(payload):
+            attr_len, attr_type = RTATTR.unpack_from(payload, pos)
+            if attr_len < RTATTR.size:
+                break
+            value = payload[pos + RTATTR.size:pos + attr_len]
+            if attr_type == IFLA_IFNAME:
+                name = value.split(b"\0", 1)[0].decode()
+            elif attr_type == IFLA_ADDRESS:
+                mac = ":".join(f"{b:02x}" for b in value)
+            elif attr_type == IFLA_MASTER and len(value) >= 4:
+                master = struct.unpack_from("=I", value)[0] or None
+            elif attr_type == IFLA_LINK and len(value) >= 4:
+                lower = struct.unpack_from("=i", value)[0]
+            pos += (attr_len + 3) & ~3
+
+        old_name = self.indexes.pop(index, None)
+        if old_name is not None and old_name != name:
+            # Renamed (or gone): forget the old name and what we knew about it
+            self.links.pop(old_name, None)
+            self.index_of.pop(old_name, None)
+            self.info.pop(index, None)
+        if msg_type == RTM_DELLINK or name is None:
+            self.links.pop(name, None)
+            self.index_of.pop(name, None)
+            self.macs.pop(index, None)
+            self.info.pop(index, None)
+            self.masters.pop(index, None)
+            self.lower.pop(index, None)
+            return
+        self.indexes[index] = name
+        if master is None:
+            self.masters.pop(index, None)
+        else:
+            self.masters[index] = master
+        if lower is None or lower == index or lower <= 0:
+            self.lower.pop(index, None)
+        else:
+            self.lower[index] = lower
+        self.index_of[name] = index
+        if mac is not None and mac != self.macs.get(index):
+            self.macs[index] = mac
+            self.info.pop(index, None)
+        self.links[name] = bool(if_flags & IFF_UP) and bool(if_flags & IFF_RUNNING)
+
+    def counted_elsewhere(self, name):
+        """
+        True if the interface's traffic also shows up on another interface:
+        it is a master (bond, team, bridge) whose members carry the same bytes,
+        or it is stacked on a lower device (VLAN, macvlan).
+        """
+        index = self.index_of.get(name)
+        return index in self.lower or index in self.masters.values()
+
+    def metadata(self, name):
+        """
+        Returns the InterfaceInfo for an interface. Sysfs is only consulted
+        the first time an ifindex is seen; after that it comes from memory.
+        """
+        index = self.index_of.get(name)
+        info = self.info.get(index)
+        if info is None:
+            info = InterfaceInfo(index, self.macs.get(index), *describe_interface(name))
+            if index is not None:
+                self.info[index] = info
+        return info
+
+    def wait(self, timeout):
+        """
+        Sleeps up to timeout seconds. Returns True early if the interface
+        table changed or a control message arrived (see self.messages).
+        """
+        if timeout <= 0:
+            return False
+        readable, _, _ = select.select([self.netlink, self.control], [], [], timeout)
+        for sock in readable:
+            if sock is self.netlink:
+                self.read_netlink()
+            else:
+                message = self.read_control()
+                if message is not None:
+                    self.messages.append(message)
+        return bool(readable)
+
+    def read_control(self):
+        """Returns the next control message, or None if it was not sent by our own user."""
+        data, ancdata, flags, address = self.control.recvmsg(4096, socket.CMSG_SPACE(UCRED.size))
+        for level, kind, payload in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_CREDENTIALS and len(payload) >= UCRED.size:
+                pid, uid, gid = UCRED.unpack_from(payload)
+                if uid == os.getuid():
+                    return data.decode(errors="replace")
+        return None
+
+
+class InterfaceCounters:
+    """
+    Byte counters of a single interface, read from sysfs through
+    descriptors opened once. Rates are divided by the real time elapsed
+    between reads, not an assumed one-second tick.
+    """
+
+    def __init__(self, interface):
+        sys_path = f"/sys/class/net/{interface}"
+        with open(f"{sys_path}/ifindex", "r") as f:
+            self.ifindex = int(f.read())
+        self.rx_fd = os.open(f"{sys_path}/statistics/rx_bytes", os.O_RDONLY)
+        try:
+            self.tx_fd = os.open(f"{sys_path}/statistics/tx_bytes", os.O_RDONLY)
+        except OSError:
+            os.close(self.rx_fd)
+            raise
+        self.last = self.read()
+
+    def read(self):
+        """Returns (rx_bytes, tx_bytes, monotonic time). Raises OSError if the interface is gone."""
+        return int(os.pread(self.rx_fd, 32, 0)), int(os.pread(self.tx_fd, 32, 0)), time.monotonic()
+
+    def rates(self):
+        """Returns (download, upload, elapsed): bytes per second over the seconds since the previous call."""
+        rx, tx, now = self.read()
+        last_rx, last_tx, last_time = self.last
+        self.last = (rx, tx, now)
+        elapsed = now - last_time
+        if elapsed <= 0 or rx < last_rx or tx < last_tx:
+            # Counters were reset (driver reload, overflow): start over from here
+            return 0.0, 0.0, max(elapsed, 0.0)
+        return (rx - last_rx) / elapsed, (tx - last_tx) / elapsed, elapsed
+
+    def close(self):
+        os.close(self.rx_fd)
+        os.close(self.tx_fd)
 
 
 def get_active_ssid(interface):
     """Returns the SSID of the connected Wi-Fi network or None."""
     try:
         result = subprocess.run(
-            ["nmcli", "-t", "-f", "ACTIVE,SSID", "dev", "wifi", "list", "ifname", interface],
+            ["nmcli", "-t", "-f", "ACTIVE,SSID", "dev", "wifi", "list", "ifname", interface, "--rescan", "no"],
             capture_output=True,
             text=True,
             check=True
@@ -316,11 +1231,11 @@ def get_active_ssid(interface):
         pass
     return None
 
-def get_active_connection_name(interface):
-    """Returns the active connection name for the interface (e.g. 'Wired connection 1')."""
+def get_active_connections():
+    """Returns a dict mapping each device to its active connection name (e.g. 'Wired connection 1')."""
+    connections = {}
     try:
         # Get active connections: NAME,DEVICE
-        # We look for the line where DEVICE matches our interface
         result = subprocess.run(
             ["nmcli", "-t", "-f", "NAME,DEVICE,TYPE", "connection", "show", "--active"],
             capture_output=True,
@@ -333,11 +1248,274 @@ def get_active_connection_name(interface):
             if len(parts) >= 2:
                 name = parts[0].replace(r"\:", ":")
                 device = parts[1]
-                if device == interface:
-                    return name
+                connections[device] = name
     except Exception:
         pass
-    return None
+    return connections
+
+
+def nm_call(conn, path, interface, method, signature=None, body=()):
+    """Calls a NetworkManager D-Bus method and returns the reply body (raises on errors)."""
+    addr = DBusAddress(path, bus_name=NM_NAME, interface=interface)
+    return unwrap_msg(conn.send_and_get_reply(new_method_call(addr, method, signature, body)))
+
+
+def nm_get(conn, path, interface, prop):
+    """Reads a NetworkManager D-Bus property."""
+    return nm_call(conn, path, "org.freedesktop.DBus.Properties", "Get", "ss", (interface, prop))[0][1]
+
+
+class ConnectionState:
+    """
+    Cached active connection name and SSID per interface.
+    A background thread keeps it up to date from NetworkManager's D-Bus
+    signals, so the monitor loop never has to fork nmcli. If D-Bus is not
+    usable it polls nmcli every NMCLI_POLL_INTERVAL seconds instead.
+    """
+
+    # Properties whose change can alter the connection name or SSID
+    WATCHED_PROPERTIES = {"ActiveConnections", "PrimaryConnection", "ActiveAccessPoint", "State", "Id", "Devices"}
+
+    def __init__(self):
+        # interface -> (connection name, ssid or None)
+        self.connections = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def get(self, interface):
+        """Returns (connection name, ssid) for the interface, either may be None."""
+        return self.connections.get(interface, (None, None))
+
+    def run(self):
+        if open_dbus_connection is not None:
+            try:
+                self.watch_dbus()
+            except Exception:
+                pass
+        self.poll_nmcli()
+
+    def poll_nmcli(self):
+        while True:
+            connections = {}
+            for device, name in get_active_connections().items():
+                ssid = get_active_ssid(device) if is_wifi(device) else None
+                connections[device] = (name, ssid)
+            self.connections = connections
+            time.sleep(NMCLI_POLL_INTERVAL)
+
+    def watch_dbus(self):
+        conn = open_dbus_connection(bus=NM_BUS)
+        try:
+            rule = MatchRule(type="signal", path_namespace=NM_PATH)
+            conn.send_and_get_reply(message_bus.AddMatch(rule))
+            with conn.filter(rule) as signals:
+                self.refresh_dbus(conn)
+                while True:
+                    msg = conn.recv_until_filtered(signals)
+                    if not self.is_relevant(msg):
+                        continue
+                    # Changes come in bursts; collect the rest before querying again
+                    try:
+                        while True:
+                            conn.recv_until_filtered(signals, timeout=0.2)
+                    except TimeoutError:
+                        pass
+                    signals.clear()
+                    self.refresh_dbus(conn)
+        finally:
+            conn.close()
+
+    def is_relevant(self, msg):
+        member = msg.header.fields.get(HeaderFields.member)
+        if member == "StateChanged":
+            return True
+        if member == "PropertiesChanged" and msg.body:
+            # D-Bus form: (interface, changed, invalidated); NM's legacy form: (changed,)
+            changed = msg.body[1] if len(msg.body) == 3 else msg.body[0]
+            return isinstance(changed, dict) and not self.WATCHED_PROPERTIES.isdisjoint(changed)
+        return False
+
+    def refresh_dbus(self, conn):
+        def get(path, interface, prop):
+            return nm_get(conn, path, interface, prop)
+
+        connections = {}
+        for active in get(NM_PATH, NM_NAME, "ActiveConnections"):
+            try:
+                name = get(active, f"{NM_NAME}.Connection.Active", "Id")
+                for device in get(active, f"{NM_NAME}.Connection.Active", "Devices"):
+                    interface = get(device, f"{NM_NAME}.Device", "Interface")
+                    ssid = None
+                    if get(device, f"{NM_NAME}.Device", "DeviceType") == NM_DEVICE_TYPE_WIFI:
+                        ap = get(device, f"{NM_NAME}.Device.Wireless", "ActiveAccessPoint")
+                        if ap != "/":
+                            ssid = bytes(get(ap, f"{NM_NAME}.AccessPoint", "Ssid")).decode(errors="replace")
+                    connections[interface] = (name, ssid)
+            except Exception:
+                # Connection went away while we were looking at it
+                continue
+        self.connections = connections
+
+
+class StatusMessage:
+    """Progress text sent by a --select process ("status ..." / "result ..."), shown until it expires."""
+
+    def __init__(self):
+        self.text = None
+        self.expires = 0.0
+
+    def update(self, messages):
+        """Takes status messages from the control socket, returns True if one arrived."""
+        changed = False
+        for message in messages:
+            kind, _, text = message.partition(" ")
+            if kind in ("status", "result"):
+                self.text = text or None
+                self.expires = time.monotonic() + (STATUS_TIMEOUT if kind == "status" else RESULT_TIMEOUT)
+                changed = True
+        return changed
+
+    def current(self):
+        if self.text and time.monotonic() < self.expires:
+            return self.text
+        self.text = None
+        return None
+
+
+class AggregateCounters:
+    """
+    Counters for a set of interfaces, summed for aggregate mode. Only the
+    watched interfaces are opened, so a tick costs two preads per watched
+    interface no matter how many other NICs the host has.
+    """
+
+    def __init__(self, watch):
+        # "all" or a list of interface names
+        self.watch = watch
+        self.counters = {}
+        self.generation = None
+
+    def sync(self, interfaces):
+        """Opens/closes counters to match the interface table, if it changed."""
+        if interfaces.generation == self.generation:
+            return
+        self.generation = interfaces.generation
+
+        if self.watch == "all":
+            # Count each byte once: members rather than their bond/bridge, lower devices rather than VLANs
+            wanted = [name for name, isup in interfaces.links.items()
+                      if isup and name != "lo" and not interfaces.counted_elsewhere(name)
+                      and interfaces.metadata(name).description not in VIRTUAL_DESCRIPTIONS]
+        else:
+            wanted = [name for name in self.watch if interfaces.links.get(name)]
+
+        for name, counters in list(self.counters.items()):
+            if name not in wanted or interfaces.indexes.get(counters.ifindex) != name:
+                counters.close()
+                del self.counters[name]
+        for name in wanted:
+            if name not in self.counters:
+                try:
+                    self.counters[name] = InterfaceCounters(name)
+                except (OSError, ValueError):
+                    continue
+
+    def rates(self):
+        """Returns (total download, total upload, elapsed, {name: (download, upload)})."""
+        per_interface = {}
+        total_down = total_up = 0.0
+        elapsed = 0.0
+        now = time.monotonic()
+        for name, counters in list(self.counters.items()):
+            if now - counters.last[2] < MIN_SAMPLE_INTERVAL:
+                # Just opened: keep the baseline and take its first rate next tick
+                continue
+            try:
+                down, up, seconds = counters.rates()
+            except (OSError, ValueError):
+                # Vanished between netlink messages; the next sync drops it
+                continue
+            per_interface[name] = (down, up)
+            total_down += down
+            total_up += up
+            elapsed = max(elapsed, seconds)
+        return total_down, total_up, elapsed, per_interface
+
+
+def monitor_aggregate(watch, interfaces, connection_state, wifi_scans):
+    """Monitoring loop for aggregate mode: one total over several interfaces."""
+    aggregate = AggregateCounters(watch)
+    throughput = ThroughputHistory()
+    talkers = TopTalkers() if TOP_TALKERS else None
+    icon = "" # Plug icon
+    status = StatusMessage()
+
+    def sleep(seconds):
+        deadline = time.monotonic() + seconds
+        while interfaces.wait(deadline - time.monotonic()):
+            if "scan" in interfaces.messages:
+                wifi_scans.request()
+            progressed = status.update(interfaces.messages)
+            interfaces.messages.clear()
+            if progressed:
+                return
+
+    while True:
+        try:
+            aggregate.sync(interfaces)
+            if not aggregate.counters:
+                output = {"text": "󰌙 Disconnected", "tooltip": "No watched interface is up", "class": "disconnected"}
+                print(json.dumps(output), flush=True)
+                sleep(2)
+                continue
+
+            download, upload, elapsed, per_interface = aggregate.rates()
+            if elapsed <= 0:
+                # Counters were just (re)opened, nothing to rate yet
+                sleep(1)
+                continue
+            throughput.push(download, upload, elapsed)
+
+            tooltip = f"Monitoring {len(per_interface)} interfaces"
+            for name, (down, up) in per_interface.items():
+                conn_name, ssid = connection_state.get(name)
+                label = ssid or conn_name or interfaces.metadata(name).description
+                tooltip += f"\n  {name:<12} {format_speed(down)} down {format_speed(up)} up  ({label})"
+
+            for label, buf in (("Down", throughput.down), ("Up", throughput.up)):
+                peak, average = throughput.stats(buf)
+                tooltip += f"\n{label:<4} avg {format_speed(average).strip()}, peak {format_speed(peak).strip()}"
+                spark = throughput.sparkline(buf)
+                if spark:
+                    tooltip += f"\n     {spark}"
+            tooltip += f"\nSession: {format_bytes(throughput.total_down)} down, {format_bytes(throughput.total_up)} up"
+
+            if talkers and max(throughput.smooth_down, throughput.smooth_up) >= TOP_TALKERS_THRESHOLD:
+                talkers.request()
+                if talkers.result:
+                    tooltip += "\nBusiest processes (TCP throughput):"
+                    for pid, comm, rate, conns, queued in talkers.result:
+                        tooltip += f"\n  {comm} ({pid}): {format_speed(rate).strip()}, {conns} sockets, {format_bytes(queued)} queued"
+
+            output = {
+                "text": f" {format_speed(throughput.smooth_down)}  {format_speed(throughput.smooth_up)}",
+                "tooltip": tooltip,
+                "class": "aggregate",
+                "alt": icon
+            }
+            progress = status.current()
+            if progress:
+                output["text"] = progress
+                output["class"] = "connecting"
+            print(json.dumps(output), flush=True)
+            sleep(1)
+
+        except (KeyboardInterrupt, SystemExit):
+            break
+        except Exception as e:
+            error_output = {"text": "⚠ Error", "tooltip": str(e), "class": "error"}
+            print(json.dumps(error_output), flush=True)
+            time.sleep(1)
 
 
 def main():
@@ -346,61 +1524,119 @@ def main():
         select_interface()
         sys.exit(0)
 
+    aggregate = AGGREGATE_INTERFACES
+    if len(sys.argv) > 1 and sys.argv[1] == '--aggregate':
+        aggregate = sys.argv[2].split(",") if len(sys.argv) > 2 and sys.argv[2] != "all" else "all"
+
     target_interface = None
-    last_io = None
+    counters = None
+    throughput = ThroughputHistory()
+    talkers = TopTalkers() if TOP_TALKERS else None
+    connection_state = ConnectionState()
+    interfaces = InterfaceTable()
+    wifi_scans = WifiScanCache(interfaces)
+    status = StatusMessage()
+    selected = get_selected_interface()
+
+    if aggregate:
+        monitor_aggregate(aggregate, interfaces, connection_state, wifi_scans)
+        return
+
+    def sleep(seconds):
+        """Sleeps, but wakes up right away if the interface to monitor changes."""
+        nonlocal selected
+        deadline = time.monotonic() + seconds
+        while interfaces.wait(deadline - time.monotonic()):
+            if "select" in interfaces.messages:
+                selected = get_selected_interface()
+            if "scan" in interfaces.messages:
+                wifi_scans.request()
+            progressed = status.update(interfaces.messages)
+            interfaces.messages.clear()
+            if progressed or get_target_interface(interfaces.links, selected) != target_interface:
+                return
 
     while True:
         try:
-            current_target = get_target_interface()
+            current_target = get_target_interface(interfaces.links, selected)
+            if selected and current_target != selected:
+                # The chosen interface went down; TEMP_FILE is gone too
+                selected = None
 
             if not current_target:
                 output = {"text": "󰌙 Disconnected", "tooltip": "No active network interface", "class": "disconnected"}
                 print(json.dumps(output), flush=True)
-                time.sleep(2)
+                target_interface = None
+                sleep(2)
                 continue
 
-            if current_target != target_interface:
+            # Reopen the counters when the target changes or its interface was re-created
+            if current_target != target_interface or interfaces.indexes.get(counters.ifindex) != target_interface:
+                if counters:
+                    counters.close()
+                    counters = None
+                if current_target != target_interface:
+                    wifi_scans.request()
                 target_interface = current_target
-                all_io = psutil.net_io_counters(pernic=True)
-                if target_interface in all_io:
-                    last_io = all_io[target_interface]
-                else:
+                throughput.reset()
+                try:
+                    counters = InterfaceCounters(target_interface)
+                except (OSError, ValueError):
                     target_interface = None
+                    sleep(1)
                     continue
-                time.sleep(1)
-
-            all_io = psutil.net_io_counters(pernic=True)
-
-            if target_interface not in all_io:
-                 output = {"text": "󰌙 Disconnected", "tooltip": f"Interface '{target_interface}' lost", "class": "disconnected"}
-                 print(json.dumps(output), flush=True)
-                 target_interface = None
-                 time.sleep(2)
-                 continue
-
-            current_io = all_io[target_interface]
-            bytes_sent = current_io.bytes_sent - last_io.bytes_sent
-            bytes_recv = current_io.bytes_recv - last_io.bytes_recv
-            upload_speed = format_speed(bytes_sent)
-            download_speed = format_speed(bytes_recv)
+                sleep(1)
+
+            # sleep() returns early for status messages and link events; a rate over
+            # a few milliseconds would turn one packet into a peak, so keep the last one
+            if time.monotonic() - counters.last[2] >= MIN_SAMPLE_INTERVAL:
+                try:
+                    download, upload, elapsed = counters.rates()
+                except (OSError, ValueError):
+                     output = {"text": "󰌙 Disconnected", "tooltip": f"Interface '{target_interface}' lost", "class": "disconnected"}
+                     print(json.dumps(output), flush=True)
+                     target_interface = None
+                     sleep(2)
+                     continue
+                throughput.push(download, upload, elapsed)
+
+            upload_speed = format_speed(throughput.smooth_up)
+            download_speed = format_speed(throughput.smooth_down)
             
-            description = get_interface_description(target_interface)
-            tooltip = f"Monitoring: {target_interface} ({description})"
+            info = interfaces.metadata(target_interface)
+            tooltip = f"Monitoring: {target_interface} ({info.description})"
+            if info.mac:
+                tooltip += f"\nMAC: {info.mac}"
             
             icon = "" # Default Plug icon
             css_class = "ethernet"
             
-            if is_wifi(target_interface):
+            conn_name, ssid = connection_state.get(target_interface)
+            if info.wireless:
                 icon = "" # Wi-Fi icon
                 css_class = "wifi"
-                ssid = get_active_ssid(target_interface)
                 if ssid:
                     tooltip += f"\nSSID: {ssid}"
             else:
                 # Wired or other: show active connection name
-                conn_name = get_active_connection_name(target_interface)
                 if conn_name:
                     tooltip += f"\nConnected to: {conn_name}"
+
+            for label, buf in (("Down", throughput.down), ("Up", throughput.up)):
+                peak, average = throughput.stats(buf)
+                tooltip += f"\n{label:<4} avg {format_speed(average).strip()}, peak {format_speed(peak).strip()}"
+                spark = throughput.sparkline(buf)
+                if spark:
+                    tooltip += f"\n     {spark}"
+            tooltip += f"\nSession: {format_bytes(throughput.total_down)} down, {format_bytes(throughput.total_up)} up"
+
+            # The scan runs in the background; show whatever it found last
+            if talkers and max(throughput.smooth_down, throughput.smooth_up) >= TOP_TALKERS_THRESHOLD:
+                talkers.request()
+                if talkers.result:
+                    tooltip += "\nBusiest processes (TCP throughput):"
+                    for pid, comm, rate, conns, queued in talkers.result:
+                        tooltip += f"\n  {comm} ({pid}): {format_speed(rate).strip()}, {conns} sockets, {format_bytes(queued)} queued"
             
             output = {
                 "text": f" {download_speed}  {upload_speed}",
@@ -408,10 +1644,13 @@ def main():
                 "class": css_class,
                 "alt": icon
             }
+            progress = status.current()
+            if progress:
+                output["text"] = progress
+                output["class"] = "connecting"
             print(json.dumps(output), flush=True)
 
-            last_io = current_io
-            time.sleep(1)
+            sleep(1)
 
         except (KeyboardInterrupt, SystemExit):
             break